@@ -0,0 +1,70 @@
+"""Доля кадров, в которых цветок скопирован из атласа спрайтов, при обычной анимации.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.flower_sprite_benchmark
+    python -m benchmarks.flower_sprite_benchmark --seconds 5 --min-share 0.99
+
+Окно MainWidget работает в обычном цикле событий на платформе offscreen с
+включённым вентилятором, цветок рисуется с интерполяцией между шагами
+симуляции. Если доля копирований из атласа среди всех отрисовок цветка
+меньше --min-share, процесс завершается с кодом 1.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+
+from flower import Flower
+
+DEFAULT_SECONDS = 3
+DEFAULT_MIN_SHARE = 0.95  # живые отрисовки допустимы, например в первом кадре после изменения размера
+
+
+def count_flower_draws(seconds: float) -> dict:
+    from main import MainWidget
+
+    window = MainWidget('flower sprite benchmark')
+    window.show()
+    window.composition.press_button()
+    window.composition.take_flower_draw_counts()
+
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        QApplication.processEvents()
+
+    counts = window.composition.take_flower_draw_counts()
+    window.close()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=DEFAULT_SECONDS)
+    parser.add_argument('--min-share', type=float, default=DEFAULT_MIN_SHARE, help='допустимая доля копий из атласа')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    random.seed(args.seed)
+
+    counts = count_flower_draws(args.seconds)
+    total = sum(counts.values())
+    share = counts[Flower.SPRITE] / total if total else 0
+    print(f'{counts[Flower.SPRITE]} sprite and {counts[Flower.LIVE]} live flower draws '
+          f'in {args.seconds:g} s: {share:.1%} from the atlas')
+
+    del app
+    if share < args.min_share:
+        print(f'below the minimum share of {args.min_share:.0%}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
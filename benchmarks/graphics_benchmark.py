@@ -0,0 +1,184 @@
+"""Микробенчмарки пакета graphics.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.graphics_benchmark --output bench.json
+    python -m benchmarks.graphics_benchmark --update-baseline
+
+Отрисовка идёт в QImage на платформе offscreen, окно не нужно.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtGui import QImage, QPainter, QPen, QBrush, QColor
+from PyQt5.QtWidgets import QApplication
+
+from graphics.figures import Star
+from graphics.matrix import Matrix, Vector
+from graphics.modifications import affine_to_point, rotate_point, connect_points
+from graphics.pictures import Picture
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+SCALES = (1, 100, 10_000)
+IMAGE_SIZE = 1200, 600
+DEFAULT_THRESHOLD = 0.25  # допустимое относительное замедление
+DEFAULT_REPEAT = 5
+
+
+def _random_point() -> QPointF:
+    return QPointF(random.uniform(0, IMAGE_SIZE[0]), random.uniform(0, IMAGE_SIZE[1]))
+
+
+def _random_star() -> Star:
+    return Star(
+        inner_radius=5, outer_radius=20, points_count=4, center=_random_point(),
+        pen=QPen(Qt.black, 3), brush=QBrush(QColor('yellow'))
+    )
+
+
+def _with_painter(draw: Callable[[QPainter], None]) -> Callable[[], None]:
+    image = QImage(*IMAGE_SIZE, QImage.Format_ARGB32_Premultiplied)
+
+    def run():
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        draw(painter)
+        painter.end()
+
+    return run
+
+
+def matrix_mul(n: int) -> Callable[[], None]:
+    a = Matrix.transfer(10, 20) * Matrix.rotate(30)
+    b = Matrix.reflection('x')
+    return lambda: [a * b for _ in range(n)]
+
+
+def matrix_mul_on_vector(n: int) -> Callable[[], None]:
+    matrix = Matrix.rotate(30)
+    vectors = [Vector.create_by_point(_random_point()) for _ in range(n)]
+    return lambda: [matrix.mul_on_vector(vector) for vector in vectors]
+
+
+def affine_to_point_bench(n: int) -> Callable[[], None]:
+    matrix = Matrix.reflection('x') * Matrix.transfer(-IMAGE_SIZE[0], 1)
+    points = [_random_point() for _ in range(n)]
+    return lambda: [affine_to_point(point, matrix) for point in points]
+
+
+def rotate_point_bench(n: int) -> Callable[[], None]:
+    center = QPointF(IMAGE_SIZE[0] / 2, IMAGE_SIZE[1] / 2)
+    points = [_random_point() for _ in range(n)]
+    return lambda: [rotate_point(point, center, 15) for point in points]
+
+
+def connect_points_bench(n: int) -> Callable[[], None]:
+    polygons = [_random_star().get_points() for _ in range(n)]
+    brush = QBrush(QColor('yellow'))
+    return _with_painter(lambda painter: [connect_points(points, painter, brush) for points in polygons])
+
+
+def star_init_points(n: int) -> Callable[[], None]:
+    stars = [_random_star() for _ in range(n)]
+    return lambda: [star._init_points() for star in stars]
+
+
+def picture_draw(n: int) -> Callable[[], None]:
+    picture = Picture([_random_star() for _ in range(n)])
+    return _with_painter(picture.draw)
+
+
+BENCHMARKS: Dict[str, Callable[[int], Callable[[], None]]] = {
+    'Matrix.__mul__': matrix_mul,
+    'Matrix.mul_on_vector': matrix_mul_on_vector,
+    'affine_to_point': affine_to_point_bench,
+    'rotate_point': rotate_point_bench,
+    'connect_points': connect_points_bench,
+    'Star._init_points': star_init_points,
+    'Picture.draw': picture_draw,
+}
+
+
+def run_benchmarks(scales=SCALES, repeat: int = DEFAULT_REPEAT) -> Dict[str, dict]:
+    random.seed(0)
+    results = {}
+
+    for name, factory in BENCHMARKS.items():
+        for n in scales:
+            run = factory(n)
+            number = max(1, 1000 // n)
+            best = min(timeit.repeat(run, repeat=repeat, number=number)) / number
+
+            results[f'{name}[{n}]'] = {'seconds': best, 'seconds_per_item': best / n}
+
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> Dict[str, float]:
+    """Возвращает отношения current / baseline, превысившие 1 + threshold"""
+
+    regressions = {}
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        ratio = result['seconds'] / baseline[key]['seconds']
+        if ratio > 1 + threshold:
+            regressions[key] = ratio
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Микробенчмарки пакета graphics')
+    parser.add_argument('--output', type=Path, help='куда записать результаты в JSON')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустимое относительное замедление, 0.25 = 25%%')
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--update-baseline', action='store_true', help='перезаписать baseline результатами')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': run_benchmarks(args.scales, args.repeat),
+    }
+
+    for key, result in report['results'].items():
+        print(f'{key:<32} {result["seconds"] * 1e3:12.4f} ms {result["seconds_per_item"] * 1e6:12.4f} us/item')
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        return 0
+
+    if not args.baseline.exists():
+        print(f'baseline {args.baseline} не найден, сравнение пропущено')
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())['results']
+    regressions = compare(report['results'], baseline, args.threshold)
+    for key, ratio in regressions.items():
+        print(f'REGRESSION {key}: x{ratio:.2f} относительно baseline')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Запись и воспроизведение звёзд через QPicture: BatchedPicture против Picture.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.star_batching_benchmark
+    python -m benchmarks.star_batching_benchmark --stars 5000 --max-ratio 1.1
+
+Звёзды с общими пером и кистью, как в Composition, записываются в QPicture,
+который затем воспроизводится в QImage, как половины окна в MainWidget.
+Время записи и воспроизведения (растеризации) меряется отдельно для звёзд,
+собранных у центра, разбросанных по кадру и настолько мелких, что они
+рисуются на уровне детализации POINT. Если BatchedPicture хоть в одном
+случае медленнее Picture больше чем в --max-ratio раз, процесс завершается
+с кодом 1.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtGui import QBrush, QColor, QImage, QPainter, QPen, QPicture
+from PyQt5.QtWidgets import QApplication
+
+from graphics.batching import BatchedPicture
+from graphics.figures import Star
+from graphics.pictures import Picture
+from graphics.styles import style_cache
+
+IMAGE_SIZE = 600, 600
+DEFAULT_STARS = 1000
+DEFAULT_REPEAT = 5
+DEFAULT_MAX_RATIO = 1.25  # разброс замеров на одной машине доходит до 15%
+
+# центр и разброс координат звёзд, радиус звезды
+SCENES: Dict[str, Tuple[float, float]] = {
+    'clustered': (60, 20),
+    'spread': (IMAGE_SIZE[0] / 2, 20),
+    'points': (IMAGE_SIZE[0] / 2, 1),
+}
+
+
+def _stars(count: int, spread: float, radius: float) -> List[Star]:
+    pen = style_cache.pen_with_alpha(QPen(Qt.black, 3), 255)
+    brush = style_cache.brush_with_alpha(QBrush(QColor('yellow')), 255)
+    center_x, center_y = IMAGE_SIZE[0] / 2, IMAGE_SIZE[1] / 2
+
+    return [
+        Star(
+            inner_radius=radius * 0.25, outer_radius=radius, points_count=4, pen=pen, brush=brush,
+            center=QPointF(center_x + random.uniform(-spread, spread), center_y + random.uniform(-spread, spread))
+        )
+        for _ in range(count)
+    ]
+
+
+def _record(picture: Picture) -> QPicture:
+    recording = QPicture()
+    painter = QPainter(recording)
+    picture.draw(painter)
+    painter.end()
+
+    return recording
+
+
+def _replay(recording: QPicture) -> Callable[[], None]:
+    image = QImage(*IMAGE_SIZE, QImage.Format_ARGB32_Premultiplied)
+
+    def run():
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPicture(0, 0, recording)
+        painter.end()
+
+    return run
+
+
+def measure(stars: List[Star], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Лучшие времена записи и воспроизведения в секундах для Picture и BatchedPicture"""
+
+    results = {}
+    for picture in (Picture(list(stars)), BatchedPicture(list(stars))):
+        record = min(timeit.repeat(lambda: _record(picture), repeat=repeat, number=1))
+        replay = min(timeit.repeat(_replay(_record(picture)), repeat=repeat, number=1))
+        results[type(picture).__name__] = dict(record=record, replay=replay)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stars', type=int, default=DEFAULT_STARS)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--max-ratio', type=float, default=DEFAULT_MAX_RATIO,
+                        help='допустимое отношение времени BatchedPicture к Picture')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    random.seed(args.seed)
+
+    print(f'{args.stars} stars, {IMAGE_SIZE[0]}x{IMAGE_SIZE[1]}, best of {args.repeat}')
+    print(f'{"scene":<10} {"picture":<15} {"record ms":>10} {"replay ms":>10} {"total ms":>10}')
+
+    slow = []
+    for scene, (spread, radius) in SCENES.items():
+        results = measure(_stars(args.stars, spread, radius), args.repeat)
+        for name, times in results.items():
+            print(f'{scene:<10} {name:<15} {times["record"] * 1000:>10.2f} {times["replay"] * 1000:>10.2f} '
+                  f'{(times["record"] + times["replay"]) * 1000:>10.2f}')
+
+        ratio = sum(results['BatchedPicture'].values()) / sum(results['Picture'].values())
+        if ratio > args.max_ratio:
+            slow.append(f'{scene}: x{ratio:.2f}')
+
+    del app
+    if slow:
+        print(f'BatchedPicture slower than Picture by more than x{args.max_ratio:g}: {", ".join(slow)}',
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Память на одну PhysicalStar по данным tracemalloc.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.star_memory_benchmark --stars 20000
+    python -m benchmarks.star_memory_benchmark --budget 850
+
+Звёзды создаются с общими пером и кистью, как в Composition, и делают
+несколько шагов анимации. Учитываются только выделения Python и numpy:
+объекты C++ за QPointF tracemalloc не видит. Если байт на звезду больше
+бюджета, процесс завершается с кодом 1.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QPointF, QRect, Qt
+from PyQt5.QtGui import QBrush, QColor, QPen
+from PyQt5.QtWidgets import QApplication
+
+from graphics.styles import style_cache
+from physical_star import PhysicalStar
+from scene_simulation import SceneSimulation
+
+DEFAULT_STARS = 10_000
+DEFAULT_STEPS = 3
+DEFAULT_BUDGET = 860  # байт на звезду; без __slots__ у фигур выходило около 1030
+DRAW_RECT = QRect(10, 10, 580, 580)
+
+
+def bytes_per_star(stars_count: int, steps: int) -> float:
+    pen = style_cache.pen_with_alpha(QPen(Qt.black, 3), 255)
+    brush = style_cache.brush_with_alpha(QBrush(QColor('yellow')), 255)
+    center = QPointF(DRAW_RECT.center())
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    stars = [
+        PhysicalStar(center=center, pen=pen, brush=brush, **SceneSimulation.random_star_parameters(20, 30))
+        for _ in range(stars_count)
+    ]
+    for _ in range(steps):
+        for star in stars:
+            star.animation(center, DRAW_RECT)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return used / len(stars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stars', type=int, default=DEFAULT_STARS)
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='допустимое число байт на звезду')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    random.seed(args.seed)
+
+    used = bytes_per_star(args.stars, args.steps)
+    print(f'{args.stars} stars after {args.steps} steps: {used:.0f} bytes per star')
+
+    del app
+    if used > args.budget:
+        print(f'over budget of {args.budget:.0f} bytes per star', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Масштабирование TiledRenderer по числу потоков.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.tiled_rendering_benchmark --width 7680 --height 4320 --workers 1 2 4 8
+    python -m benchmarks.tiled_rendering_benchmark --image poster.png
+
+Сцена записывается один раз, затем растеризуется с каждым числом потоков.
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtWidgets import QApplication
+
+from graphics.tiled_rendering import TiledRenderer
+
+DEFAULT_SIZE = 3840, 2160
+DEFAULT_STEPS = 150  # шагов симуляции до записи кадра, чтобы появились звёзды
+DEFAULT_REPEAT = 3
+
+
+def record_scene(size: QSize, steps: int):
+    from main import MainWidget
+
+    window = MainWidget('tiled rendering benchmark')
+    window.composition.update_components(MainWidget.draw_rect_for(size))
+    window.composition.press_button()
+    for _ in range(steps):
+        window.composition.animation()
+
+    return window.record_frame(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=DEFAULT_SIZE[0])
+    parser.add_argument('--height', type=int, default=DEFAULT_SIZE[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--tile-size', type=int, default=TiledRenderer.TILE_SIZE)
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--image', help='сохранить результат последнего прогона')
+    args = parser.parse_args()
+
+    app = QApplication([])
+    random.seed(args.seed)
+    size = QSize(args.width, args.height)
+    scene = record_scene(size, args.steps)
+    megapixels = size.width() * size.height() / 1e6
+
+    print(f'{size.width()}x{size.height()}, tile {args.tile_size}, {len(TiledRenderer(1, args.tile_size).tiles(size))} tiles')
+    print(f'{"workers":>8} {"seconds":>9} {"Mpx/s":>9} {"speedup":>8}')
+
+    single = None
+    image = None
+    for workers_count in sorted(set(args.workers)):
+        renderer = TiledRenderer(workers_count, args.tile_size)
+        seconds = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            image = renderer.render(scene, size)
+            seconds = min(seconds, time.perf_counter() - start)
+
+        single = single or seconds
+        print(f'{workers_count:>8} {seconds:>9.3f} {megapixels / seconds:>9.1f} {single / seconds:>7.2f}x')
+
+    if args.image is not None:
+        image.save(args.image)
+
+    del app
+
+
+if __name__ == '__main__':
+    main()
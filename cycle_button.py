@@ -1,37 +1,24 @@
 from typing import Callable
 
 from PyQt5.QtCore import QPointF, Qt
-from PyQt5.QtGui import QMouseEvent, QPen, QBrush
-from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPen, QBrush
 
 from graphics.figures import Cycle
 
 
-class CycleButton(QWidget, Cycle):
+class CycleButton(Cycle):
+    # обычная фигура, а не виджет: нажатия находит Picture.hit_test по обеим половинам окна
+    __slots__ = ('__enabled', '__on_press_event')
+
     ENABLE_BRUSH = QBrush(Qt.green)
     DISABLE_BRUSH = QBrush(Qt.red)
 
-    def __init__(self, radius=0, center=QPointF(0, 0), pen: QPen = QPen(), on_press_event: Callable = None, *args,
-                 **kwargs):
-        QWidget.__init__(self, *args, **kwargs)
-        Cycle.__init__(self, pen=pen)
-        self.radius = radius
-        self.center = center
-        self.brush = self.DISABLE_BRUSH
+    def __init__(self, radius=0, center=QPointF(0, 0), pen: QPen = QPen(), on_press_event: Callable = None):
+        super().__init__(radius, center=center, pen=pen, brush=self.DISABLE_BRUSH)
         self.__enabled = False
         self.__on_press_event = on_press_event
 
-    @Cycle.center.setter
-    def center(self, value: QPointF):
-        Cycle.center.fset(self, value)
-        self.move(int(self.center.x() - self.radius), int(self.center.y() - self.radius))
-
-    @Cycle.radius.setter
-    def radius(self, value: float):
-        Cycle.radius.fset(self, value)
-        self.resize(int(self.radius * 2), int(self.radius * 2))
-
-    def mousePressEvent(self, event: QMouseEvent) -> None:
+    def press(self):
         if self.__on_press_event is not None:
             self.__on_press_event()
 
@@ -40,8 +27,6 @@ class CycleButton(QWidget, Cycle):
         else:
             self.__enable()
 
-        self.repaint()
-
     def __disable(self):
         self.__enabled = False
         self.brush = self.DISABLE_BRUSH
@@ -1,21 +1,45 @@
-from PyQt5.QtCore import QRect
-from PyQt5.QtGui import QPainter, QBrush
+from math import ceil, floor
+from typing import Dict, Optional, Tuple
+
+from PyQt5.QtCore import QRect, QRectF, Qt
+from PyQt5.QtGui import QPainter, QBrush, QPainterPath, QPaintEngine, QTransform
 
 from graphics.figures import Drawable, Cycle
+from graphics.lod import LevelOfDetail, level_of_detail
 from graphics.matrix import Matrix
-from graphics.modifications import increase_angle, affine_to_rect
+from graphics.modifications import increase_angle, affine_to_rect, with_pen_margin
+from graphics.sprites import SpriteAtlas
 
 
 class Flower(Drawable):
     # избежать дублирования
 
-    def __init__(self, petals_count: int, core: Cycle, petal_radius: float = 0, brush: QBrush = QBrush()):
+    SPRITE_ANGLE_STEP = 15  # шаг поворота между спрайтами атласа в градусах
+    SPRITE = 'sprite'  # цветок скопирован из атласа
+    LIVE = 'live'  # цветок нарисован лепестками
+    DRAW_KINDS = (SPRITE, LIVE)
+    MAX_SPRITE_SIZE = 512  # цветок крупнее рисуется без атласа
+
+    def __init__(self, petals_count: int, core: Cycle, petal_radius: float = 0, brush: QBrush = QBrush(),
+                 use_sprites: bool = False):
+        """use_sprites: повороты, кратные SPRITE_ANGLE_STEP, копируются из заранее растеризованного атласа;
+        промежуточные углы интерполяции округляются до ближайшего спрайта
+        """
+
         self.__petal_radius = petal_radius
         self.__petals_count = petals_count
         self.__core = core
         self.__rotation = 0
+        self.__last_rotation_step = 0
+        self.__display_rotation = 0
         self.__brush = brush
 
+        self.__use_sprites = use_sprites
+        # атласы по признаку отражения и дробной части положения центра на экране
+        self.__sprites: Dict[Tuple[bool, float, float], Optional[SpriteAtlas]] = {}
+        self.__sprites_key = None
+        self.__draw_counts = dict.fromkeys(self.DRAW_KINDS, 0)
+
     @property
     def core(self) -> Cycle:
         return self.__core
@@ -29,17 +53,67 @@ class Flower(Drawable):
         self.__petal_radius = value
 
     def draw(self, painter: QPainter):
+        if self.__use_sprites and self.__draw_sprite(painter, painter.worldTransform()):
+            return
+
+        self.__draw_counts[self.LIVE] += 1
         rect = self.__get_petals_rect()
-        self.__draw_petals_by_rect(painter, rect)
+        self.__draw_petals_by_rect(painter, rect, self.__display_rotation, LevelOfDetail.scale(painter))
         self.__core.draw(painter)
 
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        if self.__use_sprites and \
+                self.__draw_sprite(painter, affine_matrix.to_qtransform() * painter.worldTransform()):
+            return
+
+        self.__draw_counts[self.LIVE] += 1
         rect = self.__get_petals_rect()
-        self.__draw_petals_by_rect(painter, affine_to_rect(rect, affine_matrix))
+        self.__draw_petals_by_rect(
+            painter, affine_to_rect(rect, affine_matrix), self.__display_rotation,
+            LevelOfDetail.scale(painter, affine_matrix)
+        )
         self.__core.draw_with_affine(affine_matrix, painter)
 
     def rotate(self, angle_in_degrees: float):
         self.__rotation = increase_angle(self.__rotation, angle_in_degrees)
+        self.__last_rotation_step = angle_in_degrees
+        self.__display_rotation = self.__rotation
+
+    @property
+    def rotation(self) -> float:
+        return self.__rotation
+
+    @property
+    def last_rotation_step(self) -> float:
+        return self.__last_rotation_step
+
+    def set_rotation(self, rotation: float, last_rotation_step: float):
+        """Выставляет состояние поворота, посчитанное вне цветка (например, в потоке симуляции)"""
+
+        self.__rotation = rotation
+        self.__last_rotation_step = last_rotation_step
+        self.__display_rotation = rotation
+
+    def is_rotating(self) -> bool:
+        return self.__last_rotation_step != 0
+
+    def interpolate(self, alpha: float):
+        rotation = self.__rotation - (1 - alpha) * self.__last_rotation_step
+        if self.__use_sprites:
+            # иначе почти каждый кадр попадал бы между спрайтами и рисовался заново
+            rotation = round(rotation / self.SPRITE_ANGLE_STEP) * self.SPRITE_ANGLE_STEP
+
+        self.__display_rotation = rotation
+
+    def take_draw_counts(self) -> Dict[str, int]:
+        """Сколько раз цветок скопирован из атласа (SPRITE) и нарисован заново (LIVE) с прошлого вызова"""
+
+        counts = self.__draw_counts
+        self.__draw_counts = dict.fromkeys(self.DRAW_KINDS, 0)
+        return counts
+
+    def bounding_rect(self) -> QRectF:
+        return with_pen_margin(QRectF(self.__get_petals_rect()), self.__core.pen).united(self.__core.bounding_rect())
 
     def __get_petals_rect(self) -> QRect:
         return QRect(
@@ -49,7 +123,80 @@ class Flower(Drawable):
             int(self.petal_radius * 2),
         )
 
-    def __draw_petals_by_rect(self, painter, rect):
+    def __draw_sprite(self, painter: QPainter, transform: QTransform) -> bool:
+        """Копирует цветок из атласа, если это возможно; False - нужно рисовать как обычно"""
+
+        # в QPicture атлас записался бы целиком, а промежуточные углы интерполяции в атласе нет
+        if self.petal_radius <= 0 or painter.paintEngine().type() == QPaintEngine.Picture:
+            return False
+
+        rotation = int(self.__display_rotation * 16)
+        angle_step = self.SPRITE_ANGLE_STEP * 16
+        if rotation % angle_step:
+            return False
+
+        # поддерживаются только сдвиг и отражение по горизонтали
+        if transform.type() > QTransform.TxScale or abs(transform.m11()) != 1 or transform.m22() != 1:
+            return False
+
+        # целая часть центра задаёт место копирования, дробная сохраняется внутри спрайта
+        center = transform.map(self.core.center)
+        x, y = floor(center.x()), floor(center.y())
+        atlas = self.__get_sprites(transform.m11() < 0, round(center.x() - x, 2), round(center.y() - y, 2))
+        if atlas is None:
+            return False
+
+        half = atlas.cell_size // 2
+        painter.save()
+        painter.resetTransform()
+        atlas.draw(painter, rotation // angle_step % atlas.count, x - half, y - half)
+        painter.restore()
+        self.__draw_counts[self.SPRITE] += 1
+
+        return True
+
+    def __get_sprites(self, mirrored: bool, dx: float, dy: float) -> Optional[SpriteAtlas]:
+        key = (self.petal_radius, self.core.radius, self.core.pen.widthF())
+        if key != self.__sprites_key:
+            # размер изменился (например, при изменении размера окна) - старые атласы не нужны
+            self.__sprites_key = key
+            self.__sprites.clear()
+
+        atlas_key = (mirrored, dx, dy)
+        if atlas_key not in self.__sprites:
+            self.__sprites[atlas_key] = self.__render_sprites(mirrored, dx, dy)
+
+        return self.__sprites[atlas_key]
+
+    def __render_sprites(self, mirrored: bool, dx: float, dy: float) -> Optional[SpriteAtlas]:
+        radius = max(self.petal_radius, self.core.radius)
+        cell_size = ceil(2 * radius + 2 * self.core.pen.widthF()) + 2
+        if cell_size > self.MAX_SPRITE_SIZE:
+            return None
+
+        center = self.core.center
+        rect = self.__get_petals_rect()
+
+        def render(painter: QPainter, index: int):
+            painter.translate(cell_size // 2 + dx, cell_size // 2 + dy)
+            if mirrored:
+                painter.scale(-1, 1)
+            painter.translate(-center)
+
+            self.__draw_petals_by_rect(painter, rect, index * self.SPRITE_ANGLE_STEP)
+            self.__core.draw(painter)
+
+        return SpriteAtlas(cell_size, 360 // self.SPRITE_ANGLE_STEP, render)
+
+    def __draw_petals_by_rect(self, painter, rect, rotation: float, scale: float = 1):
+        level = level_of_detail.select(abs(self.petal_radius) * 2 * scale)
+        if level == LevelOfDetail.POINT:
+            # лепестки сливаются в один круг
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.__brush)
+            painter.drawEllipse(rect)
+            return
+
         painter.setPen(self.__core.pen)
         painter.setBrush(self.__brush)
 
@@ -57,7 +204,20 @@ class Flower(Drawable):
 
         # Лютейшие костыли для работы отражения
         sign = 1 if rect.topRight().x() > rect.topLeft().x() else -1
-        start = self.__rotation * 16 + (step_angle if sign == -1 else 0)
+        start = int(rotation * 16) + (step_angle if sign == -1 else 0)
+
+        if level == LevelOfDetail.SIMPLIFIED:
+            # все лепестки одним путём вместо отдельного drawPie на каждый
+            # drawPie нормализует прямоугольник, оставляя углы как есть; путь должен делать так же
+            path = QPainterPath()
+            rect = QRectF(rect).normalized()
+            for i in range(self.__petals_count):
+                path.moveTo(rect.center())
+                path.arcTo(rect, sign * start / 16, sign * step_angle / 16)
+                path.closeSubpath()
+                start += 2 * step_angle
+            painter.drawPath(path)
+            return
 
         for i in range(self.__petals_count):
             painter.drawPie(rect, sign * start, sign * step_angle)
@@ -0,0 +1,168 @@
+"""Экспорт кадров композиции без окна и таймера.
+
+    python frame_export.py --frames 1000 --output frames/frame_%05d.png
+    python frame_export.py --frames 1000 --format rgba --output frames.rgba
+
+Симуляция шагает без ожидания, кадры рисуются в переиспользуемые QImage и
+передаются потокам записи через ограниченную очередь.
+"""
+import argparse
+import os
+import random
+import time
+from queue import Queue
+from threading import Thread
+from typing import Literal, Optional
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from main import MainWidget
+
+
+class FrameExporter:
+    """Рисует кадры MainWidget в пул QImage и записывает их в потоках-кодировщиках.
+
+    Число буферов фиксировано: когда все заняты, отрисовка ждёт, пока кодировщик
+    вернёт буфер, поэтому память не растёт с длиной записи.
+    """
+
+    QUEUE_SIZE = 4
+    WORKERS_COUNT = 2
+    IMAGE_FORMAT = QImage.Format_RGBA8888  # байты кадра сразу совпадают с сырым RGBA
+
+    def __init__(self, window: MainWidget, size: QSize, output: str, file_format: Literal['png', 'rgba'] = 'png',
+                 workers_count: int = WORKERS_COUNT, queue_size: int = QUEUE_SIZE):
+        """output: шаблон имени с %d для png или путь к одному файлу для rgba"""
+
+        self.__window = window
+        self.__size = size
+        self.__output = output
+        self.__format = file_format
+        self.__workers_count = workers_count
+
+        self.__frames: Queue = Queue(maxsize=queue_size)
+        self.__free_images: Queue = Queue()
+        for _ in range(queue_size + workers_count + 1):
+            self.__free_images.put(QImage(size, self.IMAGE_FORMAT))
+
+        self.__file = None
+        self.__error: Optional[BaseException] = None
+        self.__waiting_time = 0.0
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.__size.width() * self.__size.height() * 4
+
+    @property
+    def waiting_time(self) -> float:
+        """Сколько секунд отрисовка простояла в ожидании кодировщиков"""
+
+        return self.__waiting_time
+
+    def export(self, frames_count: int):
+        if self.__format == 'rgba':
+            self.__file = os.open(self.__output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+        workers = [Thread(target=self.__encode, name=f'encoder-{i}') for i in range(self.__workers_count)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            composition = self.__window.composition
+            background = self.__window.palette().window().color()
+            for index in range(frames_count):
+                if self.__error is not None:
+                    break
+
+                composition.animation()
+
+                start = time.perf_counter()
+                image = self.__free_images.get()
+                self.__waiting_time += time.perf_counter() - start
+
+                image.fill(background)
+                painter = QPainter(image)
+                painter.setRenderHint(QPainter.Antialiasing)
+                self.__window.draw_frame(painter, self.__size)
+                painter.end()
+
+                start = time.perf_counter()
+                self.__frames.put((index, image))
+                self.__waiting_time += time.perf_counter() - start
+        finally:
+            for _ in workers:
+                self.__frames.put(None)
+            for worker in workers:
+                worker.join()
+
+            if self.__file is not None:
+                os.close(self.__file)
+                self.__file = None
+
+        if self.__error is not None:
+            raise self.__error
+
+    def __encode(self):
+        while True:
+            item = self.__frames.get()
+            if item is None:
+                return
+
+            index, image = item
+            try:
+                if self.__error is None:
+                    self.__write(index, image)
+            except BaseException as error:
+                self.__error = error
+            finally:
+                self.__free_images.put(image)
+
+    def __write(self, index: int, image: QImage):
+        if self.__format == 'png':
+            if not image.save(self.__output % index, 'PNG'):
+                raise OSError(f'Не удалось записать {self.__output % index}')
+            return
+
+        # кадры пишутся по своему смещению, поэтому порядок завершения потоков не важен
+        bits = image.constBits()
+        bits.setsize(self.frame_bytes)
+        os.pwrite(self.__file, memoryview(bits), index * self.frame_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--format', choices=('png', 'rgba'), default='png')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=1200)
+    parser.add_argument('--height', type=int, default=600)
+    parser.add_argument('--workers', type=int, default=FrameExporter.WORKERS_COUNT)
+    parser.add_argument('--queue-size', type=int, default=FrameExporter.QUEUE_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication([])
+    random.seed(args.seed)
+
+    window = MainWidget('frame export')
+    window.composition.press_button()
+
+    exporter = FrameExporter(window, QSize(args.width, args.height), args.output, args.format,
+                             args.workers, args.queue_size)
+    start = time.perf_counter()
+    exporter.export(args.frames)
+    seconds = time.perf_counter() - start
+
+    print(f'{args.frames} frames in {seconds:.2f} s ({args.frames / seconds:.1f} FPS), '
+          f'waited for encoders {exporter.waiting_time:.2f} s')
+    if args.format == 'rgba':
+        print(f'raw RGBA {args.width}x{args.height}, {exporter.frame_bytes} bytes per frame')
+
+    del app
+
+
+if __name__ == '__main__':
+    main()
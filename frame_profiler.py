@@ -0,0 +1,150 @@
+import json
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Deque, Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QPoint, QRect
+from PyQt5.QtGui import QPainter, QColor, QBrush, QFont, QFontMetrics
+
+
+class FrameProfiler:
+    """Замеры фаз кадра и отрисовки компонентов с кольцевыми буферами последних кадров"""
+
+    SAMPLES_COUNT = 300
+    OVERLAY_PADDING = 6
+    OVERLAY_BACKGROUND = QColor(0, 0, 0, 160)
+    OVERLAY_FONT = QFont('Monospace', 9)
+
+    def __init__(self, samples_count: int = SAMPLES_COUNT, dump_path: Optional[str] = None):
+        self.__frame_intervals: Deque[float] = deque(maxlen=samples_count)
+        self.__phases: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=samples_count))
+        self.__components: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=samples_count))
+
+        self.__frame_phases: Dict[str, int] = defaultdict(int)
+        self.__frame_components: Dict[str, int] = defaultdict(int)
+        self.__last_frame_end = None
+        self.__frames_count = 0
+        self.__stars_count = 0
+        self.__counters: Dict[str, int] = {}
+
+        self.__dump = open(dump_path, 'w') if dump_path is not None else None
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.__frame_phases[phase] += perf_counter_ns() - start
+
+    @contextmanager
+    def measure_component(self, component: object):
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.__frame_components[type(component).__name__] += perf_counter_ns() - start
+
+    def end_frame(self, stars_count: int = 0, counters: Optional[Dict[str, int]] = None):
+        """Переносит замеры текущего кадра в кольцевые буферы; counters - произвольные счётчики кадра"""
+
+        now = perf_counter_ns()
+        frame_ms = None
+        if self.__last_frame_end is not None:
+            frame_ms = (now - self.__last_frame_end) / 1e6
+            self.__frame_intervals.append(frame_ms)
+        self.__last_frame_end = now
+
+        phases = {phase: ns / 1e6 for phase, ns in self.__frame_phases.items()}
+        components = {name: ns / 1e6 for name, ns in self.__frame_components.items()}
+        for phase, ms in phases.items():
+            self.__phases[phase].append(ms)
+        for name, ms in components.items():
+            self.__components[name].append(ms)
+
+        self.__frame_phases.clear()
+        self.__frame_components.clear()
+        self.__stars_count = stars_count
+        self.__counters = counters or {}
+        self.__frames_count += 1
+
+        if self.__dump is not None:
+            self.__dump.write(json.dumps({
+                'frame': self.__frames_count, 'frame_ms': frame_ms, 'stars': stars_count,
+                'phases': phases, 'components': components, 'counters': self.__counters,
+            }) + '\n')
+
+    def close(self):
+        if self.__dump is not None:
+            self.__dump.close()
+            self.__dump = None
+
+    def fps(self) -> float:
+        if not self.__frame_intervals:
+            return 0.0
+
+        return 1000 * len(self.__frame_intervals) / sum(self.__frame_intervals)
+
+    def frame_time_percentile(self, percent: float) -> float:
+        return self.__percentile(self.__frame_intervals, percent)
+
+    def phase_ms(self) -> Dict[str, float]:
+        """Среднее время фаз в миллисекундах по кадрам в буфере"""
+
+        return {phase: sum(samples) / len(samples) for phase, samples in self.__phases.items() if samples}
+
+    def component_ms(self) -> Dict[str, float]:
+        return {name: sum(samples) / len(samples) for name, samples in self.__components.items() if samples}
+
+    def overlay_lines(self) -> List[str]:
+        lines = [
+            f'FPS: {self.fps():.1f}',
+            'frame p50/p95/p99: {:.1f} / {:.1f} / {:.1f} ms'.format(
+                *(self.frame_time_percentile(percent) for percent in (50, 95, 99))
+            ),
+            f'stars: {self.__stars_count}',
+        ]
+        if self.__counters:
+            lines.append(' '.join(f'{name}: {value}' for name, value in self.__counters.items()))
+        lines += [f'{phase}: {ms:.2f} ms' for phase, ms in self.phase_ms().items()]
+        lines += [f'  {name}.draw: {ms:.2f} ms' for name, ms in sorted(
+            self.component_ms().items(), key=lambda item: -item[1]
+        )]
+
+        return lines
+
+    def overlay_rect(self, top_left: QPoint) -> QRect:
+        metrics = QFontMetrics(self.OVERLAY_FONT)
+        lines = self.overlay_lines()
+        width = max(metrics.horizontalAdvance(line) for line in lines)
+
+        return QRect(
+            top_left.x(), top_left.y(),
+            width + 2 * self.OVERLAY_PADDING, metrics.height() * len(lines) + 2 * self.OVERLAY_PADDING
+        )
+
+    def draw_overlay(self, painter: QPainter, top_left: QPoint):
+        lines = self.overlay_lines()
+        rect = self.overlay_rect(top_left)
+        line_height = QFontMetrics(self.OVERLAY_FONT).height()
+
+        painter.save()
+        painter.setFont(self.OVERLAY_FONT)
+        painter.fillRect(rect, QBrush(self.OVERLAY_BACKGROUND))
+        painter.setPen(Qt.white)
+        for i, line in enumerate(lines):
+            painter.drawText(
+                QRect(rect.x() + self.OVERLAY_PADDING, rect.y() + self.OVERLAY_PADDING + i * line_height,
+                      rect.width(), line_height),
+                Qt.AlignLeft | Qt.AlignVCenter, line
+            )
+        painter.restore()
+
+    @staticmethod
+    def __percentile(samples: Deque[float], percent: float) -> float:
+        if not samples:
+            return 0.0
+
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
@@ -0,0 +1,75 @@
+from time import monotonic
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QTimer
+
+
+class IdleScheduler:
+    """Вызывает tick по таймеру, пока is_animating() истинно; в простое таймер остановлен до wake_up.
+
+    Пропущенными считаются срабатывания, которые таймер сделал бы за время простоя.
+    """
+
+    def __init__(self, tick: Callable[[], None], interval_ms: int, is_animating: Callable[[], bool],
+                 on_wake_up: Optional[Callable[[], None]] = None, time_source: Callable[[], float] = monotonic):
+        """on_wake_up вызывается при выходе из простоя, например чтобы часы симуляции не догоняли паузу"""
+
+        self.__tick = tick
+        self.__interval_ms = interval_ms
+        self.__is_animating = is_animating
+        self.__on_wake_up = on_wake_up
+        self.__time_source = time_source
+
+        self.__timer = QTimer()
+        self.__timer.timeout.connect(self.__on_timeout)
+        self.__idle_since: Optional[float] = None
+        self.__executed_ticks = 0
+        self.__skipped_ticks = 0
+
+    @property
+    def is_idle(self) -> bool:
+        return self.__idle_since is not None
+
+    @property
+    def executed_ticks(self) -> int:
+        return self.__executed_ticks
+
+    @property
+    def skipped_ticks(self) -> int:
+        """Срабатывания, пропущенные в простое, включая текущий простой"""
+
+        skipped = self.__skipped_ticks
+        if self.__idle_since is not None:
+            skipped += self.__idle_ticks()
+
+        return skipped
+
+    def start(self):
+        self.__timer.start(self.__interval_ms)
+
+    def stop(self):
+        self.__timer.stop()
+
+    def wake_up(self):
+        """Возобновляет таймер после простоя: нажатие кнопки, изменение размера окна"""
+
+        if self.__idle_since is None:
+            return
+
+        self.__skipped_ticks += self.__idle_ticks()
+        self.__idle_since = None
+        if self.__on_wake_up is not None:
+            self.__on_wake_up()
+        self.start()
+
+    def __on_timeout(self):
+        if not self.__is_animating():
+            self.__timer.stop()
+            self.__idle_since = self.__time_source()
+            return
+
+        self.__executed_ticks += 1
+        self.__tick()
+
+    def __idle_ticks(self) -> int:
+        return int((self.__time_source() - self.__idle_since) * 1000 / self.__interval_ms)
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QColor
+
+from graphics.figures import Rectangle
+from graphics.lod import LevelOfDetail, level_of_detail, squares
+from graphics.matrix import Matrix
+from graphics.pictures import Picture
+
+
+class BatchedPicture(Picture):
+    """Picture, рисующий мелкие многоугольники с одними и теми же пером и кистью одним вызовом.
+
+    Одним drawRects рисуются только фигуры уровня детализации POINT: квадраты без контура
+    растеризуются дёшево, а общий путь из крупных фигур с контуром растеризуется дольше,
+    чем те же фигуры по отдельности, и теряет их порядок. Остальные компоненты рисуются
+    по очереди, как в Picture, пакеты квадратов - после них.
+
+    Пакеты определяются по тождественности объектов пера и кисти, поэтому лучше всего
+    работают с общими стилями из graphics.styles.
+    """
+
+    def __init__(self, components: List = None):
+        super().__init__(components if components is not None else [])
+        self.__batches_count = 0
+
+    @property
+    def batches_count(self) -> int:
+        """Количество пакетов, нарисованных при последней отрисовке"""
+        return self.__batches_count
+
+    def _draw_components(self, painter: QPainter):
+        self.__draw_batches(painter, None)
+
+    def _draw_components_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.__draw_batches(painter, affine_matrix)
+
+    def __draw_batches(self, painter: QPainter, affine_matrix: Optional[Matrix]):
+        batches: Dict[Tuple[int, int], Tuple[QColor, List[np.ndarray], List[float]]] = {}
+        scale = LevelOfDetail.scale(painter, affine_matrix)
+
+        for component in self._visible_components(painter, affine_matrix):
+            if isinstance(component, Rectangle) and component.lod_size() * scale < level_of_detail.point_size:
+                key = (id(component.pen), id(component.brush))
+                batch = batches.get(key)
+                if batch is None:
+                    batch = batches[key] = (component.point_color(), [], [])
+                batch[1].append(component.get_display_vertices())
+                batch[2].append(component.lod_size())
+            elif affine_matrix is None:
+                component.draw(painter)
+            else:
+                component.draw_with_affine(affine_matrix, painter)
+
+        painter.setPen(Qt.NoPen)
+        for color, polygons, sizes in batches.values():
+            level_of_detail.select_many(np.array(sizes) * scale)
+
+            starts = np.cumsum([0] + [len(polygon) for polygon in polygons])
+            vertices = np.concatenate(polygons)
+            if affine_matrix is not None:
+                vertices = affine_matrix.apply_to_points(vertices)
+
+            # центр и размах каждого многоугольника, как в Rectangle при уровне POINT
+            centers = np.add.reduceat(vertices, starts[:-1]) / np.diff(starts)[:, np.newaxis]
+            spans = np.maximum.reduceat(vertices, starts[:-1]) - np.minimum.reduceat(vertices, starts[:-1])
+
+            painter.setBrush(color)
+            painter.drawRects(squares(centers, np.maximum(spans.max(axis=1) / 2, 1)))
+
+        self.__batches_count = len(batches)
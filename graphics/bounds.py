@@ -0,0 +1,93 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QRectF
+
+# пустой прямоугольник не пересекается ни с чем и не расширяет объединение
+EMPTY_BOUNDS = (np.inf, np.inf, -np.inf, -np.inf)
+
+
+def rects_to_bounds(rects: List[QRectF]) -> np.ndarray:
+    """Массив (N, 4) строк left, top, right, bottom; пустые прямоугольники - EMPTY_BOUNDS"""
+
+    bounds = np.empty((len(rects), 4))
+    for i, rect in enumerate(rects):
+        bounds[i] = EMPTY_BOUNDS if rect.isNull() else rect.getCoords()
+
+    return bounds
+
+
+def bounds_union(bounds: np.ndarray) -> QRectF:
+    if len(bounds) == 0:
+        return QRectF()
+
+    left, top = bounds[:, :2].min(axis=0)
+    right, bottom = bounds[:, 2:].max(axis=0)
+    if left > right:
+        return QRectF()
+
+    rect = QRectF()
+    rect.setCoords(left, top, right, bottom)
+    return rect
+
+
+def intersects(bounds: np.ndarray, rect: QRectF) -> np.ndarray:
+    """Маска прямоугольников bounds, пересекающих rect"""
+
+    left, top, right, bottom = rect.getCoords()
+    return (bounds[:, 0] <= right) & (bounds[:, 2] >= left) & (bounds[:, 1] <= bottom) & (bounds[:, 3] >= top)
+
+
+class BoundsHierarchy:
+    """Дерево ограничивающих прямоугольников над массивом bounds (N, 4).
+
+    Узлы делятся пополам по медиане центров вдоль более длинной стороны, поэтому
+    поиск по точке обходит O(log N) узлов, если прямоугольники мало перекрываются.
+    """
+
+    LEAF_SIZE = 4
+
+    # узел: (left, top, right, bottom), индексы листа или None, дочерние узлы или None
+    _Node = Tuple[Tuple[float, float, float, float], Optional[np.ndarray], Optional[Tuple['_Node', '_Node']]]
+
+    def __init__(self, bounds: np.ndarray):
+        self.__bounds = bounds
+        indices = np.flatnonzero(bounds[:, 0] <= bounds[:, 2])
+        self.__root = self.__build(indices) if len(indices) else None
+
+    def query_point(self, x: float, y: float) -> np.ndarray:
+        """Индексы прямоугольников, содержащих точку, по возрастанию"""
+
+        if self.__root is None:
+            return np.empty(0, dtype=np.int64)
+
+        found = []
+        stack = [self.__root]
+        while stack:
+            (left, top, right, bottom), indices, children = stack.pop()
+            if not (left <= x <= right and top <= y <= bottom):
+                continue
+
+            if children is not None:
+                stack.extend(children)
+                continue
+
+            leaf = self.__bounds[indices]
+            found.append(indices[
+                (leaf[:, 0] <= x) & (leaf[:, 2] >= x) & (leaf[:, 1] <= y) & (leaf[:, 3] >= y)
+            ])
+
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def __build(self, indices: np.ndarray) -> _Node:
+        bounds = self.__bounds[indices]
+        box = (*bounds[:, :2].min(axis=0).tolist(), *bounds[:, 2:].max(axis=0).tolist())
+        if len(indices) <= self.LEAF_SIZE:
+            return box, indices, None
+
+        centers = (bounds[:, :2] + bounds[:, 2:]) / 2
+        axis = int(np.ptp(centers, axis=0).argmax())
+        order = indices[np.argsort(centers[:, axis], kind='stable')]
+        half = len(order) // 2
+
+        return box, None, (self.__build(order[:half]), self.__build(order[half:]))
@@ -1,15 +1,21 @@
 from abc import abstractmethod
-from math import cos, pi, sin
-from typing import List
+from typing import List, Optional
 
-from PyQt5.QtCore import QPointF
-from PyQt5.QtGui import QPainter, QBrush, QPen
+import numpy as np
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QPainter, QBrush, QPen, QPolygonF, QColor
 
+from graphics.lod import LevelOfDetail, level_of_detail, simplify_vertices
 from graphics.matrix import Matrix
-from graphics.modifications import connect_points, rotate_point, affine_to_point
+from graphics.modifications import connect_points, affine_to_point, array_to_points, \
+    increase_angle, place_template, vertices_bounding_rect, with_pen_margin
+from graphics.templates import geometry_templates
 
 
 class Drawable:
+    # фигур на сцене могут быть десятки тысяч, поэтому у них __slots__ вместо __dict__;
+    # пустые слоты базовых классов позволяют смешивать их с QWidget
+    __slots__ = ()
 
     @abstractmethod
     def draw(self, painter: QPainter):
@@ -23,8 +29,34 @@ class Drawable:
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
         pass
 
+    def bounding_rect(self) -> QRectF:
+        """Прямоугольник, вне которого draw ничего не рисует; пустой, если рисовать нечего"""
+        return QRectF()
+
+    def contains(self, point: QPointF) -> bool:
+        """Попадает ли точка в фигуру, например при нажатии мышью"""
+        return self.bounding_rect().contains(point)
+
+    def hit_test(self, point: QPointF) -> Optional['Drawable']:
+        """Фигура под точкой или None; составные фигуры возвращают вложенную"""
+        return self if self.contains(point) else None
+
+    def interpolate(self, alpha: float):
+        """Готовит к отрисовке состояние между предыдущим (0) и текущим (1) шагами симуляции"""
+        pass
+
+    def draw_with_transform(self, affine_matrix: Matrix, painter: QPainter):
+        """Рисует фигуру обычным draw, перекладывая преобразование на QPainter"""
+
+        painter.save()
+        painter.setWorldTransform(affine_matrix.to_qtransform(), True)
+        self.draw(painter)
+        painter.restore()
+
 
 class Figure(Drawable):
+    __slots__ = ('__center', '__pen', '__brush')
+
     def __init__(self, center: QPointF = QPointF(0, 0), pen: QPen = QPen(), brush: QBrush = QBrush()):
         self.__center = center
         self.__pen = pen
@@ -66,8 +98,18 @@ class Figure(Drawable):
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
         pass
 
+    def point_color(self) -> QColor:
+        """Цвет квадрата уровня детализации POINT: цвет кисти (или пера, если кисти нет)"""
+        return self.brush.color() if self.brush.style() != Qt.NoBrush else self.pen.color()
+
+    def _fill_point(self, painter: QPainter, center: QPointF, side: float):
+        side = max(side, 1)
+        painter.fillRect(QRectF(center.x() - side / 2, center.y() - side / 2, side, side), self.point_color())
+
 
 class Cycle(Figure):
+    __slots__ = ('__radius',)
+
     def __init__(self, radius: float = 0, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__radius = radius
@@ -81,64 +123,135 @@ class Cycle(Figure):
         self.__radius = value
 
     def draw(self, painter: QPainter):
-        super(Cycle, self).draw(painter)
-        painter.drawEllipse(self.center, self.radius, self.radius)
+        self.__draw_at(self.center, LevelOfDetail.scale(painter), painter)
 
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.__draw_at(affine_to_point(self.center, affine_matrix), LevelOfDetail.scale(painter, affine_matrix), painter)
+
+    def __draw_at(self, center: QPointF, scale: float, painter: QPainter):
+        # окружность и так рисуется одним примитивом, поэтому SIMPLIFIED совпадает с FULL
+        if level_of_detail.select(abs(self.radius) * 2 * scale) == LevelOfDetail.POINT:
+            self._fill_point(painter, center, abs(self.radius) * 1.77)  # квадрат той же площади
+            return
+
         super(Cycle, self).draw(painter)
-        painter.drawEllipse(affine_to_point(self.center, affine_matrix), self.radius, self.radius)
+        painter.drawEllipse(center, self.radius, self.radius)
+
+    def bounding_rect(self) -> QRectF:
+        return with_pen_margin(QRectF(
+            self.center.x() - self.radius, self.center.y() - self.radius, self.radius * 2, self.radius * 2
+        ), self.pen)
+
+    def contains(self, point: QPointF) -> bool:
+        return (point.x() - self.center.x()) ** 2 + (point.y() - self.center.y()) ** 2 <= self.radius ** 2
 
     def rotate(self, angle_in_degrees: float):
         pass
 
 
 class Rectangle(Figure):
+    # прямоугольник кэшируется до смены массива вершин для отрисовки или пера
+    __slots__ = ('__rotation', '_vertices', '__bounds', '__bounds_vertices', '__bounds_pen')
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._points = self._init_points()
+        self.__rotation = 0
+        self._vertices = self._init_points()
+        self.__bounds = self.__bounds_vertices = self.__bounds_pen = None
 
     @abstractmethod
-    def _init_points(self) -> List[QPointF]:
+    def _init_points(self) -> np.ndarray:
+        """Возвращает массив вершин формы (N, 2) с учётом center и rotation"""
         pass
 
     def get_points(self) -> List[QPointF]:
-        return self._points
+        return array_to_points(self._vertices)
+
+    def get_vertices(self) -> np.ndarray:
+        return self._vertices
+
+    def get_display_vertices(self) -> np.ndarray:
+        """Вершины для отрисовки, могут отличаться от get_vertices после interpolate"""
+        return self._vertices
 
     @Figure.center.setter
     def center(self, value: QPointF):
         Figure.center.fset(self, value)
-        self._points = self._init_points()
+        self._vertices = self._init_points()
+
+    @property
+    def rotation(self) -> float:
+        return self.__rotation
+
+    @rotation.setter
+    def rotation(self, value: float):
+        self.__rotation = value
+        self._vertices = self._init_points()
+
+    def place(self, center: QPointF, rotation: float):
+        """Меняет center и rotation с единственным пересчётом вершин"""
+
+        Figure.center.fset(self, center)
+        self.__rotation = rotation
+        self._vertices = self._init_points()
+
+    def lod_size(self) -> float:
+        """Размер фигуры для выбора уровня детализации"""
+
+        return float(np.ptp(self._vertices, axis=0).max())
 
     def draw(self, painter: QPainter):
-        super().draw(painter)
-        connect_points(self._points, painter, self.brush)
+        self.__draw_vertices(self.get_display_vertices(), LevelOfDetail.scale(painter), painter)
 
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.__draw_vertices(
+            affine_matrix.apply_to_points(self.get_display_vertices()),
+            LevelOfDetail.scale(painter, affine_matrix), painter
+        )
+
+    def __draw_vertices(self, vertices: np.ndarray, scale: float, painter: QPainter):
+        level = level_of_detail.select(self.lod_size() * scale)
+        if level == LevelOfDetail.POINT:
+            x, y = vertices.mean(axis=0)
+            self._fill_point(painter, QPointF(x, y), float(np.ptp(vertices, axis=0).max()) / 2)
+            return
+
         super().draw(painter)
-        connect_points(list(
-            map(lambda point: affine_to_point(point, affine_matrix), self.get_points())
-        ), painter, self.brush)
+        if level == LevelOfDetail.SIMPLIFIED:
+            painter.drawPolygon(QPolygonF(array_to_points(simplify_vertices(vertices))))
+        else:
+            connect_points(array_to_points(vertices), painter, self.brush)
+
+    def bounding_rect(self) -> QRectF:
+        vertices = self.get_display_vertices()
+        if vertices is not self.__bounds_vertices or self.pen is not self.__bounds_pen:
+            self.__bounds = with_pen_margin(vertices_bounding_rect(vertices), self.pen)
+            self.__bounds_vertices = vertices
+            self.__bounds_pen = self.pen
+
+        return self.__bounds
+
+    def contains(self, point: QPointF) -> bool:
+        return self.bounding_rect().contains(point) and \
+            QPolygonF(array_to_points(self.get_display_vertices())).containsPoint(point, Qt.WindingFill)
 
     def rotate(self, angle_in_degrees: float):
-        for point in self._points:
-            rotate_point(point, self.center, angle_in_degrees)
+        self.rotation = increase_angle(self.rotation, angle_in_degrees)
 
 
 class RegularPolygon(Rectangle):
+    __slots__ = ('__sides_count', '__center_distance')
+
     def __init__(self, sides_count: int, center_distance: float = 0, *args, **kwargs):
         self.__sides_count = sides_count
         self.__center_distance = center_distance
         super().__init__(*args, **kwargs)
 
-    def _init_points(self):
-        val = 2 * pi / self.sides_count
-        self._points = [
-            QPointF(
-                self.center.x() + self.center_distance * cos(val * i),
-                self.center.y() + self.center_distance * sin(val * i),
-            ) for i in range(self.sides_count)
-        ]
+    def _init_points(self) -> np.ndarray:
+        return place_template(
+            geometry_templates.regular_polygon(self.sides_count),
+            self.center, self.center_distance, self.rotation
+        )
 
     @property
     def center_distance(self) -> float:
@@ -147,14 +260,18 @@ class RegularPolygon(Rectangle):
     @center_distance.setter
     def center_distance(self, value: float):
         self.__center_distance = value
-        self._init_points()
+        self._vertices = self._init_points()
 
     @property
     def sides_count(self) -> int:
         return self.__sides_count
 
+    def lod_size(self) -> float:
+        return self.__center_distance * 2
+
 
 class Star(Rectangle):
+    __slots__ = ('__inner_radius', '__outer_radius', '__points_count')
 
     def __init__(self, inner_radius: float, outer_radius: float,
                  points_count: int, *args, **kwargs):
@@ -171,20 +288,22 @@ class Star(Rectangle):
     def inner_radius(self) -> float:
         return self.__inner_radius
 
-    def _init_points(self) -> List[QPointF]:
-        points = []
+    @property
+    def points_count(self) -> int:
+        return self.__points_count
 
-        val = pi / self.__points_count
+    def lod_size(self) -> float:
+        return self.__outer_radius * 2
 
-        for i in range(self.__points_count * 2):
-            if i % 2 == 0:
-                radius = self.__outer_radius
-            else:
-                radius = self.__inner_radius
+    def set_radiuses(self, inner_radius: float, outer_radius: float):
+        self.__inner_radius = inner_radius
+        self.__outer_radius = outer_radius
+        self._vertices = self._init_points()
 
-            points.append(QPointF(
-                self.center.x() + radius * cos(val * i),
-                self.center.y() + radius * sin(val * i)
-            ))
+    def _init_points(self) -> np.ndarray:
+        inner_ratio = self.__inner_radius / self.__outer_radius if self.__outer_radius else 0
 
-        return points
+        return place_template(
+            geometry_templates.star(self.__points_count, inner_ratio),
+            self.center, self.__outer_radius, self.rotation
+        )
@@ -0,0 +1,46 @@
+from typing import Callable, Dict, Hashable
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QPainter, QPixmap
+
+
+class LayerCache:
+    """Растеризует неизменяемую часть сцены в QPixmap и переиспользует её между кадрами"""
+
+    def __init__(self):
+        self.__size = QSize()
+        self.__layers: Dict[Hashable, QPixmap] = {}
+        self.__renders_count = 0
+
+    @property
+    def renders_count(self) -> int:
+        return self.__renders_count
+
+    def invalidate(self):
+        self.__layers.clear()
+
+    def draw(self, painter: QPainter, size: QSize, key: Hashable, render: Callable[[QPainter], None]):
+        """Рисует слой key размером size, растеризуя его через render при первом обращении или смене размера"""
+
+        if size != self.__size:
+            self.__size = size
+            self.invalidate()
+
+        layer = self.__layers.get(key)
+        if layer is None:
+            layer = self.__render(size, painter.renderHints(), render)
+            self.__layers[key] = layer
+
+        painter.drawPixmap(0, 0, layer)
+
+    def __render(self, size: QSize, hints: QPainter.RenderHints, render: Callable[[QPainter], None]) -> QPixmap:
+        layer = QPixmap(size)
+        layer.fill(Qt.transparent)
+
+        layer_painter = QPainter(layer)
+        layer_painter.setRenderHints(hints)
+        render(layer_painter)
+        layer_painter.end()
+
+        self.__renders_count += 1
+        return layer
@@ -0,0 +1,93 @@
+from math import sqrt
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QPainter
+
+from graphics.matrix import Matrix
+
+
+class LevelOfDetail:
+    """Выбор детализации фигуры по её размеру на экране в пикселях и счётчики выбранных уровней"""
+
+    POINT = 'point'  # закрашенный квадрат без контура
+    SIMPLIFIED = 'simplified'  # многоугольник с вдвое меньшим числом вершин одним примитивом
+    FULL = 'full'
+    LEVELS = (POINT, SIMPLIFIED, FULL)
+
+    POINT_SIZE = 4  # фигуры меньше рисуются квадратом
+    SIMPLIFIED_SIZE = 16  # фигуры меньше рисуются упрощённо
+
+    def __init__(self, point_size: float = POINT_SIZE, simplified_size: float = SIMPLIFIED_SIZE):
+        self.point_size = point_size
+        self.simplified_size = simplified_size
+        self.__counts = dict.fromkeys(self.LEVELS, 0)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Сколько фигур нарисовано на каждом уровне с последнего take_counts"""
+        return dict(self.__counts)
+
+    def take_counts(self) -> Dict[str, int]:
+        counts = self.counts
+        self.__counts = dict.fromkeys(self.LEVELS, 0)
+        return counts
+
+    def select(self, size: float) -> str:
+        if size < self.point_size:
+            level = self.POINT
+        elif size < self.simplified_size:
+            level = self.SIMPLIFIED
+        else:
+            level = self.FULL
+
+        self.__counts[level] += 1
+        return level
+
+    def select_many(self, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Маски фигур уровней POINT, SIMPLIFIED и FULL по массиву размеров"""
+
+        point = sizes < self.point_size
+        full = sizes >= self.simplified_size
+        simplified = ~point & ~full
+
+        for level, mask in zip(self.LEVELS, (point, simplified, full)):
+            self.__counts[level] += int(np.count_nonzero(mask))
+
+        return point, simplified, full
+
+    @staticmethod
+    def scale(painter: QPainter, affine_matrix: Optional[Matrix] = None) -> float:
+        """Во сколько раз размер в координатах фигуры увеличивается на экране"""
+
+        transform = painter.worldTransform()
+        scale = sqrt(abs(transform.determinant()))
+        if affine_matrix is not None:
+            scale *= sqrt(abs(np.linalg.det(affine_matrix.to_numpy()[:2, :2])))
+
+        return scale
+
+
+def simplify_vertices(vertices: np.ndarray) -> np.ndarray:
+    """Оставляет каждую вторую вершину многоугольников (..., N, 2), если их останется не меньше 4.
+
+    У звезды остаются внешние вершины.
+    """
+
+    if vertices.shape[-2] < 8:
+        return vertices
+
+    return vertices[..., ::2, :]
+
+
+def squares(centers: np.ndarray, sizes: np.ndarray) -> List[QRectF]:
+    """Квадраты со сторонами sizes вокруг centers формы (N, 2)"""
+
+    return [
+        QRectF(x - size / 2, y - size / 2, size, size)
+        for (x, y), size in zip(centers.tolist(), sizes.tolist())
+    ]
+
+
+level_of_detail = LevelOfDetail()
@@ -1,19 +1,30 @@
 from math import radians, cos, sin
 from typing import List, Literal, Tuple
 
+import numpy as np
 from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QTransform
 
 
 class Matrix:
+    """Матрица 3x3 во вложенных списках: для одной точки чистый Python быстрее numpy.
+
+    Массив numpy строится по требованию и кэшируется для пакетных операций вроде apply_to_points.
+    """
+
     N = 3
+    __IDENTITY = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
 
     def __init__(self, array: List[List[float]] = None):
         """Do not use externally"""
 
-        if array is not None:
-            self.__array = array
-        else:
-            self.__array = [[0 for _ in range(self.N)] for _ in range(self.N)]
+        if array is None:
+            array = [[0 for _ in range(self.N)] for _ in range(self.N)]
+        elif isinstance(array, np.ndarray):
+            array = array.tolist()
+
+        self.__array = array
+        self.__numpy = None
 
     @staticmethod
     def transfer(delta_x: float, delta_y: float) -> 'Matrix':
@@ -23,6 +34,14 @@ class Matrix:
             [0, 0, 1]
         ])
 
+    @staticmethod
+    def identity() -> 'Matrix':
+        return Matrix([
+            [1, 0, 0],
+            [0, 1, 0],
+            [0, 0, 1]
+        ])
+
     @staticmethod
     def rotate(angle_in_degrees: float) -> 'Matrix':
         angle_in_radians = radians(angle_in_degrees)
@@ -32,6 +51,19 @@ class Matrix:
             [0, 0, 1]
         ])
 
+    @staticmethod
+    def rotate_around(center_x: float, center_y: float, angle_in_degrees: float,
+                      delta_x: float = 0, delta_y: float = 0) -> 'Matrix':
+        """transfer(center + delta) * rotate(angle) * transfer(-center), собранная сразу"""
+
+        angle_in_radians = radians(angle_in_degrees)
+        c, s = cos(angle_in_radians), sin(angle_in_radians)
+        return Matrix([
+            [c, -s, center_x + delta_x - c * center_x + s * center_y],
+            [s, c, center_y + delta_y - s * center_x - c * center_y],
+            [0, 0, 1]
+        ])
+
     @staticmethod
     def scaling(kx: float, ky: float) -> 'Matrix':
         return Matrix([
@@ -56,27 +88,58 @@ class Matrix:
             [0, 0, 1]
         ])
 
-    def __mul__(self, other: 'Matrix') -> 'Matrix':
-        result = Matrix()
+    @staticmethod
+    def from_qtransform(transform: QTransform) -> 'Matrix':
+        # QTransform хранит матрицу транспонированной (вектор-строка слева)
+        return Matrix([
+            [transform.m11(), transform.m21(), transform.m31()],
+            [transform.m12(), transform.m22(), transform.m32()],
+            [transform.m13(), transform.m23(), transform.m33()]
+        ])
 
-        for i in range(self.N):
-            for j in range(self.N):
-                for k in range(self.N):
-                    result.__array[i][j] += self.__array[i][k] * other.__array[k][j]
+    def to_qtransform(self) -> QTransform:
+        a = self.__array
+        return QTransform(
+            a[0][0], a[1][0], a[2][0],
+            a[0][1], a[1][1], a[2][1],
+            a[0][2], a[1][2], a[2][2]
+        )
 
-        return result
+    def to_numpy(self) -> np.ndarray:
+        if self.__numpy is None:
+            self.__numpy = np.array(self.__array, dtype=float)
+
+        return self.__numpy
+
+    def is_identity(self) -> bool:
+        return self.__array == self.__IDENTITY
+
+    def inverse(self) -> 'Matrix':
+        return Matrix(np.linalg.inv(self.to_numpy()))
+
+    def __mul__(self, other: 'Matrix') -> 'Matrix':
+        a, b = self.__array, other.__array
+        return Matrix([
+            [a[i][0] * b[0][j] + a[i][1] * b[1][j] + a[i][2] * b[2][j] for j in range(self.N)]
+            for i in range(self.N)
+        ])
 
     def mul_on_vector(self, vector: 'Vector') -> 'Vector':
-        col = []
+        (a, b, c), (d, e, f), (g, h, i) = self.__array
+        x, y, z = vector
+        return Vector((a * x + b * y + c * z, d * x + e * y + f * z, g * x + h * y + i * z))
+
+    def apply_to_points(self, points: np.ndarray) -> np.ndarray:
+        """Применяет матрицу сразу ко всем точкам массива формы (N, 2)"""
 
-        for i in range(self.N):
-            s = 0
-            for j in range(self.N):
-                s += self.__array[i][j] * vector[j]
+        array = self.to_numpy()
+        result = points @ array[:2, :2].T + array[:2, 2]
 
-            col.append(s)
+        w = points @ array[2, :2] + array[2, 2]
+        if not np.all(w == 1):
+            result /= w[:, np.newaxis]
 
-        return Vector(col)
+        return result
 
 
 class Vector(Tuple[float, float, float]):
@@ -1,8 +1,9 @@
 from math import radians, cos, sin, sqrt
 from typing import List
 
-from PyQt5.QtCore import QPointF, QRect
-from PyQt5.QtGui import QPainterPath, QBrush, QPainter
+import numpy as np
+from PyQt5.QtCore import QPointF, QRect, QRectF
+from PyQt5.QtGui import QPainterPath, QBrush, QPainter, QPen
 
 from graphics.matrix import Matrix, Vector
 
@@ -45,6 +46,38 @@ def affine_to_point(point: QPointF, affine_matrix: Matrix) -> QPointF:
     return affine_matrix.mul_on_vector(vector).to_point()
 
 
+def points_to_array(points: List[QPointF]) -> np.ndarray:
+    return np.array([(point.x(), point.y()) for point in points], dtype=float).reshape(-1, 2)
+
+
+def array_to_points(array: np.ndarray) -> List[QPointF]:
+    return [QPointF(x, y) for x, y in array.tolist()]
+
+
+def affine_to_points(points: np.ndarray, affine_matrix: Matrix) -> List[QPointF]:
+    return array_to_points(affine_matrix.apply_to_points(points))
+
+
+def rotate_points(points: np.ndarray, center: QPointF, angle_in_degrees: float) -> np.ndarray:
+    cos_fi = cos(radians(angle_in_degrees))
+    sin_fi = sin(radians(angle_in_degrees))
+    diff = points - (center.x(), center.y())
+
+    return np.column_stack((
+        center.x() + diff[:, 0] * cos_fi - diff[:, 1] * sin_fi,
+        center.y() + diff[:, 0] * sin_fi + diff[:, 1] * cos_fi
+    ))
+
+
+def place_template(template: np.ndarray, center: QPointF, scale: float, angle_in_degrees: float) -> np.ndarray:
+    """Масштабирует, поворачивает и переносит в center вершины шаблона единичного радиуса"""
+
+    cos_fi = scale * cos(radians(angle_in_degrees))
+    sin_fi = scale * sin(radians(angle_in_degrees))
+
+    return template @ np.array([[cos_fi, sin_fi], [-sin_fi, cos_fi]]) + (center.x(), center.y())
+
+
 def affine_to_rect(rect: QRect, affine_matrix: Matrix) -> QRect:
     coords = rect.getCoords()
 
@@ -54,5 +87,23 @@ def affine_to_rect(rect: QRect, affine_matrix: Matrix) -> QRect:
     )
 
 
+def vertices_bounding_rect(vertices: np.ndarray) -> QRectF:
+    if len(vertices) == 0:
+        return QRectF()
+
+    (left, top), (right, bottom) = vertices.min(axis=0), vertices.max(axis=0)
+    return QRectF(QPointF(left, top), QPointF(right, bottom))
+
+
+def with_pen_margin(rect: QRectF, pen: QPen) -> QRectF:
+    """Расширяет rect на половину толщины пера и пиксель сглаживания"""
+
+    if rect.isNull():
+        return rect
+
+    margin = pen.widthF() / 2 + 1
+    return rect.adjusted(-margin, -margin, margin, margin)
+
+
 def distance_between_points(p1: QPointF, p2: QPointF) -> float:
     return sqrt((p2.x() - p1.x()) ** 2 + (p2.y() - p1.y()) ** 2)
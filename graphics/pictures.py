@@ -1,15 +1,42 @@
-from typing import List
+from typing import List, Optional
 
-from PyQt5.QtGui import QPainter
+import numpy as np
+from PyQt5.QtCore import QRectF, QPointF
+from PyQt5.QtGui import QPainter, QTransform
 from PyQt5.QtWidgets import QWidget
 
+from graphics.bounds import BoundsHierarchy, bounds_union, intersects, rects_to_bounds
 from graphics.figures import Drawable
 from graphics.matrix import Matrix
+from graphics.modifications import affine_to_point
 
 
 class Picture(Drawable):
+    """Узел сцены: компоненты рисуются в локальной системе координат узла.
+
+    Мировое преобразование (произведение локальных от корня) кэшируется и
+    пересчитывается только после изменения локального преобразования узла или его предков.
+
+    Ограничивающие прямоугольники компонентов тоже кэшируются: по ним при отрисовке
+    пропускаются компоненты вне области отсечения QPainter и ищется компонент под точкой.
+    Кэш сбрасывается при изменении компонентов через Picture, interpolate и rotate;
+    кто меняет компоненты напрямую, вызывает invalidate_bounds.
+    """
+
+    # Объект с методом measure_component(component) -> context manager; None отключает замеры
+    profiler = None
+    CULLING = True  # не рисовать компоненты вне painter.clipBoundingRect()
+
     def __init__(self, components: List[Drawable] = []):
-        self.__components = components
+        self.__parent_picture: Optional[Picture] = None
+        self.__local_transform = Matrix.identity()
+        self.__local_qtransform: Optional[QTransform] = None  # None для единичного преобразования
+        self.__world_transform: Optional[Matrix] = None
+        self.__world_inverse: Optional[Matrix] = None
+        self.__child_bounds: Optional[np.ndarray] = None  # (N, 4) в локальных координатах
+        self.__bounds: Optional[QRectF] = None
+        self.__bounds_hierarchy: Optional[BoundsHierarchy] = None
+        self.components = components
 
     @property
     def components(self) -> List[Drawable]:
@@ -18,18 +45,184 @@ class Picture(Drawable):
     @components.setter
     def components(self, value: List[Drawable]):
         self.__components = value
+        for component in value:
+            if isinstance(component, Picture):
+                component.__attach(self)
+        self.invalidate_bounds()
+
+    def add_component(self, component: Drawable):
+        self.__components.append(component)
+        if isinstance(component, Picture):
+            component.__attach(self)
+        self.invalidate_bounds()
+
+    @property
+    def parent_picture(self) -> Optional['Picture']:
+        return self.__parent_picture
+
+    @property
+    def local_transform(self) -> Matrix:
+        return self.__local_transform
+
+    @local_transform.setter
+    def local_transform(self, value: Matrix):
+        self.__local_transform = value
+        self.__local_qtransform = None if value.is_identity() else value.to_qtransform()
+        self.invalidate_world_transform()
+        self.invalidate_bounds()
+
+    @property
+    def world_transform(self) -> Matrix:
+        if self.__world_transform is None:
+            if self.__parent_picture is None:
+                self.__world_transform = self.__local_transform
+            else:
+                self.__world_transform = self.__parent_picture.world_transform * self.__local_transform
+
+        return self.__world_transform
+
+    def map_to_world(self, point: QPointF) -> QPointF:
+        return affine_to_point(point, self.world_transform)
+
+    def map_from_world(self, point: QPointF) -> QPointF:
+        """Переводит точку сцены в локальные координаты узла, например для попадания курсором"""
+
+        if self.__world_inverse is None:
+            self.__world_inverse = self.world_transform.inverse()
+
+        return affine_to_point(point, self.__world_inverse)
+
+    def invalidate_world_transform(self):
+        """Сбрасывает кэш мирового преобразования узла и всех вложенных Picture"""
+
+        if self.__world_transform is None and self.__world_inverse is None:
+            return
+
+        self.__world_transform = self.__world_inverse = None
+        for component in self.__components:
+            if isinstance(component, Picture):
+                component.invalidate_world_transform()
+
+    def invalidate_bounds(self):
+        """Сбрасывает кэш прямоугольников узла и его предков после изменения компонентов"""
+
+        picture = self
+        while picture is not None and picture.__child_bounds is not None:
+            picture.__child_bounds = picture.__bounds = picture.__bounds_hierarchy = None
+            picture = picture.__parent_picture
+
+    def hit_test(self, point: QPointF) -> Optional[Drawable]:
+        """Верхний (нарисованный последним) компонент под точкой в мировых координатах или None.
+
+        Точка переводится в координаты узла через кэшированное обратное мировое преобразование.
+        """
+
+        local_point = self.map_from_world(point)
+
+        if self.__bounds_hierarchy is None:
+            self.__bounds_hierarchy = BoundsHierarchy(self.__get_child_bounds())
+
+        for index in reversed(self.__bounds_hierarchy.query_point(local_point.x(), local_point.y()).tolist()):
+            component = self.components[index]
+            # вложенные Picture сами переводят мировую точку в свои координаты
+            hit = component.hit_test(point if isinstance(component, Picture) else local_point)
+            if hit is not None:
+                return hit
+
+        return None
 
     def draw(self, painter: QPainter):
-        for component in self.components:
-            component.draw(painter)
+        if self.__local_qtransform is None:
+            self._draw_components(painter)
+            return
+
+        painter.save()
+        painter.setWorldTransform(self.__local_qtransform, True)
+        self._draw_components(painter)
+        painter.restore()
+
+    def _draw_components(self, painter: QPainter):
+        components = self._visible_components(painter)
+        if Picture.profiler is None:
+            for component in components:
+                component.draw(painter)
+            return
+
+        for component in components:
+            with Picture.profiler.measure_component(component):
+                component.draw(painter)
+
+    def _visible_components(self, painter: QPainter, affine_matrix: Optional[Matrix] = None) -> List[Drawable]:
+        """Компоненты, пересекающие область отсечения; affine_matrix переводит локальные координаты в painter"""
+
+        components = self.components
+        if not self.CULLING or not components or not painter.hasClipping():
+            return components
+
+        clip = painter.clipBoundingRect()
+        if affine_matrix is not None:
+            clip = affine_matrix.inverse().to_qtransform().mapRect(clip)
+
+        visible = intersects(self.__get_child_bounds(), clip)
+        if visible.all():
+            return components
+
+        return [component for component, is_visible in zip(components, visible.tolist()) if is_visible]
 
     def rotate(self, angle_in_degrees: float):
         for component in self.components:
             component.rotate(angle_in_degrees)
+        self.invalidate_bounds()
 
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        if self.__local_qtransform is not None:
+            affine_matrix = affine_matrix * self.__local_transform
+
+        self._draw_components_with_affine(affine_matrix, painter)
+
+    def _draw_components_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        components = self._visible_components(painter, affine_matrix)
+        if Picture.profiler is None:
+            for component in components:
+                component.draw_with_affine(affine_matrix, painter)
+            return
+
+        for component in components:
+            with Picture.profiler.measure_component(component):
+                component.draw_with_affine(affine_matrix, painter)
+
+    def bounding_rect(self) -> QRectF:
+        """Ограничивающий прямоугольник в системе координат родителя"""
+
+        if self.__bounds is None:
+            rect = bounds_union(self.__get_child_bounds())
+            if self.__local_qtransform is not None and not rect.isNull():
+                rect = self.__local_qtransform.mapRect(rect)
+            self.__bounds = rect
+
+        return self.__bounds
+
+    def contains(self, point: QPointF) -> bool:
+        if self.__parent_picture is not None:
+            point = self.__parent_picture.map_to_world(point)
+
+        return self.hit_test(point) is not None
+
+    def interpolate(self, alpha: float):
         for component in self.components:
-            component.draw_with_affine(affine_matrix, painter)
+            component.interpolate(alpha)
+        self.invalidate_bounds()
+
+    def __get_child_bounds(self) -> np.ndarray:
+        if self.__child_bounds is None or len(self.__child_bounds) != len(self.components):
+            self.__child_bounds = rects_to_bounds([component.bounding_rect() for component in self.components])
+
+        return self.__child_bounds
+
+    def __attach(self, parent: 'Picture'):
+        self.__parent_picture = parent
+        self.invalidate_world_transform()
+        parent.invalidate_bounds()
 
 
 class PictureWidget(QWidget, Picture):
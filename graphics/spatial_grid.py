@@ -0,0 +1,115 @@
+from typing import Dict, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QRectF
+
+
+class SpatialGrid:
+    """Равномерная сетка для поиска соседних точек без перебора всех пар"""
+
+    # соседние клетки, при обходе которых каждая пара клеток встречается ровно один раз
+    __HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size: float):
+        self.__cell_size = cell_size
+        self.__positions = np.empty((0, 2))
+        self.__cells = np.empty((0, 2), dtype=np.int64)
+        self.__buckets: Dict[Tuple[int, int], np.ndarray] = {}
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    @property
+    def cells_count(self) -> int:
+        return len(self.__buckets)
+
+    def rebuild(self, positions: np.ndarray, cell_size: float = None):
+        """Раскладывает точки массива формы (N, 2) по клеткам, при необходимости меняя их размер"""
+
+        if cell_size is not None:
+            self.__cell_size = cell_size
+
+        self.__positions = positions
+        self.__buckets = {}
+        if len(positions) == 0 or self.__cell_size <= 0:
+            self.__cells = np.empty((0, 2), dtype=np.int64)
+            return
+
+        self.__cells = np.floor(positions / self.__cell_size).astype(np.int64)
+
+        order = np.lexsort((self.__cells[:, 1], self.__cells[:, 0]))
+        unique_cells, starts = np.unique(self.__cells[order], axis=0, return_index=True)
+        for cell, indices in zip(map(tuple, unique_cells.tolist()), np.split(order, starts[1:])):
+            self.__buckets[cell] = indices
+
+    def query(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Индексы точек не дальше radius от (x, y)"""
+
+        if not self.__buckets:
+            return np.empty(0, dtype=np.int64)
+
+        reach = int(np.ceil(radius / self.__cell_size))
+        cx, cy = int(np.floor(x / self.__cell_size)), int(np.floor(y / self.__cell_size))
+
+        candidates = [
+            self.__buckets[cell]
+            for cell in ((cx + dx, cy + dy) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1))
+            if cell in self.__buckets
+        ]
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate(candidates)
+        distances = np.hypot(*(self.__positions[candidates] - (x, y)).T)
+        return candidates[distances <= radius]
+
+    def pairs_within(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Пары индексов (i, j), i != j, с расстоянием не больше radius и сами расстояния.
+
+        radius не должен превышать cell_size, иначе часть пар будет пропущена.
+        """
+
+        first, second = [], []
+        for (cx, cy), indices in self.__buckets.items():
+            for dx, dy in self.__HALF_NEIGHBOURHOOD:
+                other = self.__buckets.get((cx + dx, cy + dy))
+                if other is None:
+                    continue
+
+                i, j = np.meshgrid(indices, other, indexing='ij')
+                i, j = i.ravel(), j.ravel()
+                if dx == 0 and dy == 0:
+                    keep = i < j
+                    i, j = i[keep], j[keep]
+
+                first.append(i)
+                second.append(j)
+
+        if not first:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        first, second = np.concatenate(first), np.concatenate(second)
+        distances = np.hypot(*(self.__positions[first] - self.__positions[second]).T)
+        close = distances <= radius
+
+        return first[close], second[close], distances[close]
+
+    def near_boundary(self, rect: QRectF, margin: float) -> np.ndarray:
+        """Маска точек, клетка которых ближе margin к границе rect или выходит за неё.
+
+        Точки вне маски гарантированно лежат внутри rect с запасом margin.
+        Если клеток нет (нулевой размер клетки), в маску попадают все точки.
+        """
+
+        if len(self.__cells) == 0:
+            return np.ones(len(self.__positions), dtype=bool)
+
+        cell_min = self.__cells * self.__cell_size
+        cell_max = cell_min + self.__cell_size
+
+        return ~(
+            (cell_min[:, 0] >= rect.left() + margin) & (cell_max[:, 0] <= rect.right() - margin) &
+            (cell_min[:, 1] >= rect.top() + margin) & (cell_max[:, 1] <= rect.bottom() - margin)
+        )
@@ -0,0 +1,49 @@
+from math import ceil, sqrt
+from typing import Callable
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPainter, QPixmap
+
+
+class SpriteAtlas:
+    """Квадратные спрайты одного размера, растеризованные в общий QPixmap"""
+
+    def __init__(self, cell_size: int, count: int, render: Callable[[QPainter, int], None],
+                 hints: QPainter.RenderHints = QPainter.Antialiasing):
+        """render(painter, index) рисует спрайт index в клетке [0, cell_size) x [0, cell_size)"""
+
+        self.__cell_size = cell_size
+        self.__count = count
+        self.__columns = ceil(sqrt(count))
+
+        rows = ceil(count / self.__columns)
+        self.__pixmap = QPixmap(self.__columns * cell_size, rows * cell_size)
+        self.__pixmap.fill(Qt.transparent)
+
+        painter = QPainter(self.__pixmap)
+        painter.setRenderHints(hints)
+        for index in range(count):
+            cell = self.__cell_rect(index)
+            painter.save()
+            painter.setClipRect(cell)
+            painter.translate(cell.topLeft())
+            render(painter, index)
+            painter.restore()
+        painter.end()
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def cell_size(self) -> int:
+        return self.__cell_size
+
+    def draw(self, painter: QPainter, index: int, x: int, y: int):
+        """Копирует спрайт index левым верхним углом клетки в точку (x, y) без масштабирования"""
+
+        painter.drawPixmap(x, y, self.__pixmap, *self.__cell_rect(index).getRect())
+
+    def __cell_rect(self, index: int) -> QRect:
+        row, column = divmod(index, self.__columns)
+        return QRect(column * self.__cell_size, row * self.__cell_size, self.__cell_size, self.__cell_size)
@@ -0,0 +1,68 @@
+from typing import Dict, Hashable
+
+import numpy as np
+from PyQt5.QtGui import QPen, QBrush, QColor
+
+
+class StyleCache:
+    """Общие QPen и QBrush с квантованной прозрачностью.
+
+    Выданные объекты разделяются между фигурами, изменять их нельзя.
+    """
+
+    ALPHA_LEVELS = 32
+
+    def __init__(self, alpha_levels: int = ALPHA_LEVELS):
+        self.__alpha_levels = alpha_levels
+        self.__pens: Dict[Hashable, QPen] = {}
+        self.__brushes: Dict[Hashable, QBrush] = {}
+
+    def __len__(self) -> int:
+        return len(self.__pens) + len(self.__brushes)
+
+    def quantize_alpha(self, alpha: float) -> int:
+        alpha = min(max(alpha, 0), 255)
+        step = 255 / (self.__alpha_levels - 1)
+
+        return int(round(round(alpha / step) * step))
+
+    def quantize_alphas(self, alphas: np.ndarray) -> np.ndarray:
+        step = 255 / (self.__alpha_levels - 1)
+        return np.round(np.round(np.clip(alphas, 0, 255) / step) * step).astype(int)
+
+    def pen_with_alpha(self, pen: QPen, alpha: float) -> QPen:
+        alpha = self.quantize_alpha(alpha)
+        key = (pen.color().rgb(), pen.widthF(), int(pen.style()), int(pen.capStyle()), int(pen.joinStyle()), alpha)
+
+        cached = self.__pens.get(key)
+        if cached is None:
+            cached = QPen(pen)
+            cached.setColor(self.__with_alpha(pen.color(), alpha))
+            self.__pens[key] = cached
+
+        return cached
+
+    def brush_with_alpha(self, brush: QBrush, alpha: float) -> QBrush:
+        alpha = self.quantize_alpha(alpha)
+        key = (brush.color().rgb(), int(brush.style()), alpha)
+
+        cached = self.__brushes.get(key)
+        if cached is None:
+            cached = QBrush(brush)
+            cached.setColor(self.__with_alpha(brush.color(), alpha))
+            self.__brushes[key] = cached
+
+        return cached
+
+    def clear(self):
+        self.__pens.clear()
+        self.__brushes.clear()
+
+    @staticmethod
+    def __with_alpha(color: QColor, alpha: int) -> QColor:
+        color = QColor(color)
+        color.setAlpha(alpha)
+        return color
+
+
+style_cache = StyleCache()
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from math import pi
+from typing import Hashable, Callable
+
+import numpy as np
+
+
+class GeometryTemplates:
+    """Ограниченный LRU-кэш вершин фигур единичного радиуса"""
+
+    MAX_SIZE = 128
+    RATIO_PRECISION = 6
+
+    def __init__(self, max_size: int = MAX_SIZE):
+        self.__max_size = max_size
+        self.__templates = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __len__(self) -> int:
+        return len(self.__templates)
+
+    def star(self, points_count: int, inner_ratio: float) -> np.ndarray:
+        """Вершины звезды с внешним радиусом 1 и внутренним inner_ratio"""
+
+        inner_ratio = round(inner_ratio, self.RATIO_PRECISION)
+        return self.__get(
+            ('star', points_count, inner_ratio),
+            lambda: self.__build_star(points_count, inner_ratio)
+        )
+
+    def regular_polygon(self, sides_count: int) -> np.ndarray:
+        return self.__get(
+            ('regular_polygon', sides_count),
+            lambda: self.__build_star(sides_count, 1.0)[0::2]
+        )
+
+    def clear(self):
+        self.__templates.clear()
+        self.__hits = self.__misses = 0
+
+    def __get(self, key: Hashable, build: Callable[[], np.ndarray]) -> np.ndarray:
+        template = self.__templates.get(key)
+
+        if template is not None:
+            self.__hits += 1
+            self.__templates.move_to_end(key)
+            return template
+
+        self.__misses += 1
+        template = build()
+        template.setflags(write=False)
+
+        self.__templates[key] = template
+        if len(self.__templates) > self.__max_size:
+            self.__templates.popitem(last=False)
+
+        return template
+
+    @staticmethod
+    def __build_star(points_count: int, inner_ratio: float) -> np.ndarray:
+        angles = np.arange(points_count * 2) * (pi / points_count)
+
+        # чётные вершины лежат на внешнем радиусе, нечётные - на внутреннем
+        radiuses = np.empty(points_count * 2)
+        radiuses[0::2] = 1.0
+        radiuses[1::2] = inner_ratio
+
+        return np.column_stack((radiuses * np.cos(angles), radiuses * np.sin(angles)))
+
+
+geometry_templates = GeometryTemplates()
@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from PyQt5.QtCore import Qt, QRect, QSize, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage, QPainter, QPicture, QColor
+
+
+class TiledRenderer:
+    """Растеризует записанную в QPicture сцену в QImage по плиткам в пуле потоков.
+
+    QPainter поверх QImage можно использовать вне GUI-потока, а PyQt отпускает GIL
+    на время воспроизведения QPicture, поэтому плитки рисуются параллельно.
+    Сцена не должна содержать QPixmap: их нельзя использовать вне GUI-потока.
+    """
+
+    TILE_SIZE = 512
+    IMAGE_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+    def __init__(self, workers_count: Optional[int] = None, tile_size: int = TILE_SIZE,
+                 antialiasing: bool = True, background: QColor = QColor(Qt.white)):
+        self.__workers_count = workers_count or os.cpu_count() or 1
+        self.__tile_size = tile_size
+        self.__antialiasing = antialiasing
+        self.__background = background
+
+    @property
+    def workers_count(self) -> int:
+        return self.__workers_count
+
+    def tiles(self, size: QSize) -> List[QRect]:
+        return [
+            QRect(x, y, min(self.__tile_size, size.width() - x), min(self.__tile_size, size.height() - y))
+            for y in range(0, size.height(), self.__tile_size)
+            for x in range(0, size.width(), self.__tile_size)
+        ]
+
+    def render(self, scene: QPicture, size: QSize) -> QImage:
+        tiles = self.tiles(size)
+        data = self.__serialize(scene)
+
+        if self.__workers_count == 1:
+            images = [self.__render_tile(data, tile) for tile in tiles]
+        else:
+            with ThreadPoolExecutor(self.__workers_count) as executor:
+                images = list(executor.map(lambda tile: self.__render_tile(data, tile), tiles))
+
+        image = QImage(size, self.IMAGE_FORMAT)
+        painter = QPainter(image)
+        for tile, tile_image in zip(tiles, images):
+            painter.drawImage(tile.topLeft(), tile_image)
+        painter.end()
+
+        return image
+
+    @staticmethod
+    def __serialize(scene: QPicture) -> QByteArray:
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        scene.save(buffer)
+        buffer.close()
+
+        return data
+
+    def __render_tile(self, data: QByteArray, tile: QRect) -> QImage:
+        # воспроизведение QPicture читает его общий буфер, поэтому у каждой плитки своя копия
+        buffer = QBuffer()
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        scene = QPicture()
+        scene.load(buffer)
+
+        image = QImage(tile.size(), self.IMAGE_FORMAT)
+        image.fill(self.__background)
+
+        painter = QPainter(image)
+        if self.__antialiasing:
+            painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-tile.x(), -tile.y())
+        painter.setClipRect(tile)
+        painter.drawPicture(0, 0, scene)
+        painter.end()
+
+        return image
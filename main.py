@@ -1,49 +1,130 @@
-import random
-
-from PyQt5.QtCore import QRect, Qt, QPointF, QTimer
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor
+import os
+from contextlib import nullcontext
+from time import monotonic
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from PyQt5.QtCore import QRect, Qt, QPointF, QRectF, QPoint, QSize
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPicture, QRegion, QMouseEvent
 from PyQt5.QtWidgets import QApplication, QWidget
 
 from cycle_button import CycleButton
+from frame_profiler import FrameProfiler
+from frame_scheduler import IdleScheduler
+from graphics.batching import BatchedPicture
+from graphics.figures import Drawable
+from graphics.layers import LayerCache
+from graphics.lod import level_of_detail
 from graphics.matrix import Matrix
-from graphics.modifications import affine_to_rect
+from graphics.modifications import affine_to_rect, with_pen_margin
 from graphics.pictures import Picture, PictureWidget
+from graphics.spatial_grid import SpatialGrid
+from graphics.styles import style_cache
 from physical_star import PhysicalStar
+from recording import SceneRecorder, SceneReplayer
+from scene_simulation import SceneSimulation, SceneSnapshot
+from simulation_clock import SimulationClock
+from simulation_thread import SimulationThread, SnapshotBuffer
+from star_field import StarField
+from star_interactions import StarInteractions
+from star_pool import StarPool
 from ventilator import Ventilator
 
-FPS = 30
+FPS = 30  # частота шагов симуляции
+RENDER_FPS = 60  # частота перерисовки окна
 
 
 class Composition(PictureWidget):
     MAIN_PEN_THICKNESS = 3  # Толщина основного пера
-    CHANCE_OF_STAR_CREATING_IN_FRAME = 0.1
+    CHANCE_OF_STAR_CREATING_IN_FRAME = 0.1  # больше 1 - несколько звёзд за шаг
+    MAX_STARS_COUNT = 10
+    BATCH_STARS = True  # мелкие звёзды с общими пером и кистью рисуются одним drawRects
+    STARS_INTERACTION = False  # звёзды расталкиваются и сливаются при касании
+    USE_STAR_FIELD = False  # звёзды хранятся в массивах StarField, а не объектами PhysicalStar
+    CACHE_STATIC_LAYER = True  # рамка, ножка и платформа растеризуются один раз на размер окна
+    SPRITE_FLOWER = True  # цветок копируется из атласа повёрнутых спрайтов отдельным слоем
     MAIN_PEN = QPen(Qt.black, MAIN_PEN_THICKNESS)
     MAIN_BRUSH = QBrush()
+    STAR_PEN = style_cache.pen_with_alpha(QPen(Qt.black, MAIN_PEN_THICKNESS), 255)
+    STAR_BRUSH = style_cache.brush_with_alpha(QBrush(QColor('yellow')), 255)
+
+    def __init__(self, draw_rect: QRect, main_window: QWidget, use_star_field: bool = False,
+                 threaded_simulation: bool = False, replay: bool = False,
+                 on_button_press: Optional[Callable[[], None]] = None, *args, **kwargs):
+        """threaded_simulation: звёзды и вентилятор считаются в отдельном потоке, а рисуются
+        последние опубликованные им снимки; animation() в этом режиме не вызывается.
+        replay: рисуются только снимки, переданные в show_snapshot, например из записи.
+        on_button_press: вызывается после нажатия кнопки, например чтобы выйти из простоя.
+        """
 
-    def __init__(self, draw_rect: QRect, main_window: QWidget, *args, **kwargs):
         PictureWidget.__init__(self, *args, **kwargs)
 
         self.__main_window = main_window
         self.__draw_rect = draw_rect
+        self.__layout_rect: Optional[QRect] = None  # прямоугольник последней раскладки
+        self.__on_button_press_event = on_button_press
 
-        self.__ventilator = Ventilator(QRect())
-        self.__button = CycleButton(
-            parent=self.__main_window,
-            pen=self.MAIN_PEN,
-            on_press_event=self.__ventilator.change_enable_status
+        self.__ventilator = Ventilator(
+            QRect(), draw_static=not self.CACHE_STATIC_LAYER,
+            draw_flower=not self.SPRITE_FLOWER, flower_sprites=self.SPRITE_FLOWER
         )
+        self.__static_layer = LayerCache()
+        self.__button = CycleButton(pen=self.MAIN_PEN, on_press_event=self.__on_button_press)
+
+        self.__stars_composite = BatchedPicture() if self.BATCH_STARS else Picture([])
+        self.__star_pool = StarPool()
+        self.__stars_grid = SpatialGrid(0)
+        self.__star_interactions = StarInteractions() if self.STARS_INTERACTION else None
+        self.__star_field = StarField(
+            pen=self.STAR_PEN,
+            brush=self.STAR_BRUSH,
+            interactions=self.__star_interactions
+        ) if use_star_field and not threaded_simulation and not replay else None
+
+        self.__simulation = None
+        self.__snapshots = None
+        self.__simulation_thread = None
+        self.__replay = replay
+        self.__shows_snapshots = threaded_simulation or replay
+        self.__snapshot = None
+        self.__steps_count = 0
+        self.__snapshot_stars = Picture([])  # звёзды текущего снимка
+        if threaded_simulation:
+            self.__simulation = SceneSimulation(
+                StarField(pen=self.STAR_PEN, brush=self.STAR_BRUSH, interactions=self.__star_interactions),
+                FPS, Ventilator.ROTATION_STEP, self.CHANCE_OF_STAR_CREATING_IN_FRAME, self.MAX_STARS_COUNT
+            )
+            self.__snapshots = SnapshotBuffer(lambda: SceneSnapshot(self.STAR_PEN, self.STAR_BRUSH))
+            self.__simulation_thread = SimulationThread(self.__simulation, self.__snapshots, 1 / FPS)
 
-        self.__stars_composite = Picture()
+        if self.__shows_snapshots:
+            stars = self.__snapshot_stars
+        elif use_star_field:
+            stars = self.__star_field
+        else:
+            stars = self.__stars_composite
 
-        self.components = [self.__ventilator, self.__button, self.__stars_composite]
+        self.__stars = stars
+        self.components = [self.__ventilator, self.__button, stars]
+
+        self.__animated_rects = []
+        self.__pending_dirty_rects = []
 
     def animation(self):
+        self.__steps_count += 1
+        self.__ventilator.animation()
 
-        if self.__ventilator.is_enabled():
-            self.__ventilator.animation()
-            if len(self.__stars_composite.components) <= 10 and self.CHANCE_OF_STAR_CREATING_IN_FRAME >= random.random():
+        if self.__ventilator.is_enabled() and self.stars_count() <= self.MAX_STARS_COUNT:
+            for _ in range(SceneSimulation.spawn_count(self.CHANCE_OF_STAR_CREATING_IN_FRAME)):
                 self.__create_random_star()
 
+        # звёзды меняются в обход Picture, поэтому кэш прямоугольников сбрасывается вручную
+        self.__invalidate_stars_bounds()
+
+        if self.__star_field is not None:
+            self.__star_field.animation(self.__ventilator.get_flower().core.center, self.__draw_rect)
+            return
+
         stars = self.__stars_composite.components
 
         # анимация звезд
@@ -51,106 +132,605 @@ class Composition(PictureWidget):
             if isinstance(star, PhysicalStar):
                 star.animation(self.__ventilator.get_flower().core.center, self.__draw_rect)
 
-        # удаление потухших звезд
-        self.__stars_composite.components = list(filter(
-            lambda s: s.is_alive(self.__draw_rect), stars
-        ))
+        if not stars:
+            return
+
+        centers = np.array([(star.center.x(), star.center.y()) for star in stars])
+        outer_radiuses = np.array([star.outer_radius for star in stars])
+        self.__stars_grid.rebuild(centers, StarInteractions.cell_size(outer_radiuses))
+
+        alive = np.ones(len(stars), dtype=bool)
+        max_shift = 0.0
+        if self.__star_interactions is not None:
+            max_shift = self.__apply_star_interactions(stars, centers, outer_radiuses, alive)
+
+        # удаление потухших звезд; вершины проверяются только у звезд из клеток у границы,
+        # запас считается по радиусам после слияний
+        near_boundary = self.__stars_grid.near_boundary(
+            QRectF(self.__draw_rect), float(outer_radiuses.max()) + max_shift + 1
+        )
+        alive_count = 0
+        for star, is_alive, check in zip(stars, alive.tolist(), near_boundary.tolist()):
+            if is_alive and (not check or star.is_alive(self.__draw_rect)):
+                stars[alive_count] = star
+                alive_count += 1
+            else:
+                self.__star_pool.release(star)
+        del stars[alive_count:]
+
+    def start_simulation(self):
+        if self.__simulation_thread is not None:
+            self.__simulation_thread.start()
+
+    def stop_simulation(self):
+        if self.__simulation_thread is not None:
+            self.__simulation_thread.stop()
+
+    def take_snapshot(self) -> float:
+        """Переключается на последний снимок потока симуляции и возвращает долю шага для интерполяции"""
+
+        snapshot = self.__snapshots.acquire_latest()
+        if snapshot is None:
+            return 1.0
+
+        if snapshot is not self.__snapshot:
+            self.show_snapshot(snapshot)
+
+        return min(1.0, (monotonic() - snapshot.time) * FPS)
+
+    def create_snapshot(self) -> SceneSnapshot:
+        return SceneSnapshot(self.STAR_PEN, self.STAR_BRUSH)
+
+    def show_snapshot(self, snapshot: SceneSnapshot):
+        """Рисует дальше состояние из snapshot вместо собственного; snapshot нельзя менять, пока он показан"""
+
+        self.__snapshot = snapshot
+        self.__snapshot_stars.components = [snapshot.stars]
+        self.__ventilator.get_flower().set_rotation(snapshot.flower_rotation, snapshot.flower_rotation_step)
+
+        # в потоке симуляции состояние кнопки и так следует за нажатиями, при воспроизведении - за записью
+        if self.__replay and self.__ventilator.is_enabled() != snapshot.enabled:
+            self.__button.press()
+
+    def write_snapshot(self, snapshot: SceneSnapshot):
+        """Копирует текущее состояние сцены в snapshot"""
+
+        flower = self.__ventilator.get_flower()
+        snapshot.flower_rotation = flower.rotation
+        snapshot.flower_rotation_step = flower.last_rotation_step
+        snapshot.enabled = self.__ventilator.is_enabled()
+        snapshot.time = monotonic()
+
+        if self.__snapshot is not None:
+            snapshot.stars.copy_from(self.__snapshot.stars)
+            snapshot.step_index = self.__snapshot.step_index
+        elif self.__star_field is not None:
+            snapshot.stars.copy_from(self.__star_field)
+            snapshot.step_index = self.__steps_count
+        else:
+            snapshot.stars.load_records(np.array(
+                [star.to_record() for star in self.__stars_composite.components], dtype=StarField.RECORD_DTYPE
+            ))
+            snapshot.step_index = self.__steps_count
+
+    def is_animating(self) -> bool:
+        """Изменится ли что-нибудь на экране в следующих кадрах"""
+
+        return self.__ventilator.is_enabled() or self.__ventilator.get_flower().is_rotating() or \
+            self.stars_count() > 0 or bool(self.__pending_dirty_rects)
+
+    def take_flower_draw_counts(self) -> Dict[str, int]:
+        return self.__ventilator.get_flower().take_draw_counts()
+
+    def stars_count(self) -> int:
+        if self.__shows_snapshots:
+            return len(self.__snapshot.stars) if self.__snapshot is not None else 0
+
+        if self.__star_field is not None:
+            return len(self.__star_field)
+
+        return len(self.__stars_composite.components)
+
+    def take_dirty_rects(self) -> List[QRectF]:
+        """Области основной половины, изменившиеся с прошлого вызова"""
+
+        current_rects = self.__get_animated_rects()
+        dirty_rects = self.__pending_dirty_rects + self.__animated_rects + current_rects
+
+        self.__animated_rects = current_rects
+        self.__pending_dirty_rects = []
+
+        return [rect for rect in dirty_rects if not rect.isEmpty()]
 
     def draw(self, painter):
+        self.draw_static_layer(painter)
+        self.draw_flower_layer(painter)
+        self.draw_components(painter)
+
+    def draw_static_layer(self, painter: QPainter):
+        if self.CACHE_STATIC_LAYER:
+            self.__static_layer.draw(
+                painter, self.__get_device_size(painter), self.__draw_rect.getCoords(), self.__draw_static
+            )
+        else:
+            self.__draw_static(painter)
+
+    def draw_flower_layer(self, painter: QPainter):
+        """Цветок при SPRITE_FLOWER: между статическим слоем и остальными компонентами"""
+
+        if self.SPRITE_FLOWER:
+            self.__ventilator.draw_flower(painter)
+
+    def draw_components(self, painter: QPainter):
+        PictureWidget.draw(self, painter)
+
+    def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        if self.CACHE_STATIC_LAYER:
+            self.__static_layer.draw(
+                painter, self.__get_device_size(painter),
+                (self.__draw_rect.getCoords(), tuple(affine_matrix.to_numpy().flat)),
+                lambda layer_painter: self.__draw_static_with_affine(affine_matrix, layer_painter)
+            )
+        else:
+            self.__draw_static_with_affine(affine_matrix, painter)
+
+        if self.SPRITE_FLOWER:
+            self.__ventilator.draw_flower_with_affine(affine_matrix, painter)
+        PictureWidget.draw_with_affine(self, affine_matrix, painter)
+
+    def draw_scene(self, painter: QPainter, affine_matrix: Matrix):
+        """Рисует обе половины без растрового кэша статического слоя, например для записи в QPicture"""
+
+        painter.save()
+        painter.setWorldTransform(affine_matrix.to_qtransform(), True)
+        self.__draw_static(painter)
+        self.draw_flower_layer(painter)
+        self.draw_components(painter)
+        painter.restore()
+
+        self.__draw_static(painter)
+        self.draw_flower_layer(painter)
+        self.draw_components(painter)
+
+    def frame_rect(self) -> QRectF:
+        """Прямоугольник рамки основной половины, за который ничего не рисуется"""
+
+        return with_pen_margin(QRectF(self.__draw_rect), self.MAIN_PEN)
+
+    @staticmethod
+    def __get_device_size(painter: QPainter) -> QSize:
+        return QSize(painter.device().width(), painter.device().height())
+
+    def __draw_static(self, painter: QPainter):
         painter.setPen(self.MAIN_PEN)
         painter.setBrush(self.MAIN_BRUSH)
         painter.drawRect(self.__draw_rect)
-        PictureWidget.draw(self, painter)
+        self.__ventilator.draw_static(painter)
 
-    def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+    def __draw_static_with_affine(self, affine_matrix: Matrix, painter: QPainter):
         painter.setPen(self.MAIN_PEN)
         painter.setBrush(self.MAIN_BRUSH)
         painter.drawRect(affine_to_rect(self.__draw_rect, affine_matrix))
-        PictureWidget.draw_with_affine(self, affine_matrix, painter)
+        self.__ventilator.draw_static_with_affine(affine_matrix, painter)
 
-    def show(self) -> None:
-        self.__button.show()
+    def press_button(self):
+        """Нажатие кнопки без события мыши, например при экспорте кадров"""
+
+        self.__button.press()
 
     def update_components(self, draw_rect: QRect):
+        """Раскладывает компоненты по draw_rect; для того же прямоугольника ничего не делает"""
+
+        if draw_rect == self.__layout_rect:
+            return
+
+        self.__layout_rect = QRect(draw_rect)
         self.__draw_rect = draw_rect
+        self.invalidate_bounds()
         self.__ventilator.set_draw_rect(self.__draw_rect)
 
         start = self.__draw_rect.bottomLeft()
 
+        self.__button.radius = min(self.__draw_rect.width(), self.__draw_rect.height()) * 0.025
+
         self.__button.center = QPointF(
             start.x() + self.__draw_rect.width() * 0.6,
             start.y() - self.__draw_rect.height() * 0.05
         )
 
-        self.__button.radius = min(self.__draw_rect.width(), self.__draw_rect.height()) * 0.025
+        if self.__simulation is not None:
+            core = self.__ventilator.get_flower().core
+            self.__simulation.set_layout(self.__draw_rect, core.center, core.radius)
+
+    def __apply_star_interactions(self, stars: List[PhysicalStar], centers: np.ndarray,
+                                  outer_radiuses: np.ndarray, alive: np.ndarray) -> float:
+        """Сдвигает и сливает звезды, поглощенные отмечает в alive, а новые радиусы записывает
+        в outer_radiuses; возвращает наибольший сдвиг
+        """
+
+        ages = np.array([star.age for star in stars])
+        displacements, merges = self.__star_interactions.step(self.__stars_grid, centers, outer_radiuses, ages)
+
+        for star, (dx, dy) in zip(stars, displacements.tolist()):
+            if dx or dy:
+                star.place(star.center + QPointF(dx, dy), star.rotation)
+
+        for keep, absorbed in merges:
+            stars[keep].set_radiuses(
+                StarInteractions.merged_radius(stars[keep].inner_radius, stars[absorbed].inner_radius),
+                StarInteractions.merged_radius(stars[keep].outer_radius, stars[absorbed].outer_radius)
+            )
+            outer_radiuses[keep] = stars[keep].outer_radius
+            alive[absorbed] = False
+
+        return float(np.hypot(*displacements.T).max())
+
+    def __on_button_press(self):
+        self.__ventilator.change_enable_status()
+        if self.__simulation is not None:
+            self.__simulation.toggle_enabled()
+        self.__pending_dirty_rects.append(self.__button.bounding_rect())
+        if self.__on_button_press_event is not None:
+            self.__on_button_press_event()
+
+    def __get_animated_rects(self) -> List[QRectF]:
+        rects = []
+
+        flower = self.__ventilator.get_flower()
+        if self.__ventilator.is_enabled() or flower.is_rotating():
+            rects.append(flower.bounding_rect())
+
+        if self.__shows_snapshots:
+            rects.append(self.__snapshot_stars.bounding_rect())
+        elif self.__star_field is not None:
+            rects.append(self.__star_field.bounding_rect())
+        else:
+            rects.extend(star.bounding_rect() for star in self.__stars_composite.components)
+
+        return rects
+
+    def __invalidate_stars_bounds(self):
+        if isinstance(self.__stars, Picture):
+            self.__stars.invalidate_bounds()
+        else:
+            self.invalidate_bounds()
 
     def __create_random_star(self):
-        star_outer_radius = self.__ventilator.get_flower().core.radius
+        parameters = SceneSimulation.random_star_parameters(self.__ventilator.get_flower().core.radius, FPS)
+
+        if self.__star_field is not None:
+            self.__star_field.add_star(center=self.__ventilator.get_flower().core.center, **parameters)
+            return
 
         self.__stars_composite.components.append(
-            PhysicalStar(
-                inner_radius=star_outer_radius * 0.25, outer_radius=star_outer_radius,
-                inner_angle_speed=random.randint(1, 355) / FPS, outer_angle_speed=random.randint(1, FPS),
-                distance_speed=random.randint(FPS, FPS + 10),
+            self.__star_pool.acquire(
+                **parameters,
                 center=self.__ventilator.get_flower().core.center,
-                pen=QPen(Qt.black, self.MAIN_PEN_THICKNESS),
-                brush=QBrush(QColor('yellow'))
+                pen=self.STAR_PEN,
+                brush=self.STAR_BRUSH
             )
         )
 
 
+class CompositionHalf(Drawable):
+    """Половина кадра: статический слой, цветок и компоненты Composition.
+
+    Отражённая половина - тот же объект в Picture с отражением в local_transform.
+    Если задана scene, компоненты воспроизводятся из этой записи, а не рисуются заново.
+    """
+
+    def __init__(self, composition: Composition):
+        self.__composition = composition
+        self.scene: Optional[QPicture] = None
+
+    def draw(self, painter: QPainter):
+        if self.scene is None:
+            self.__composition.draw(painter)
+            return
+
+        self.__composition.draw_static_layer(painter)
+        self.__composition.draw_flower_layer(painter)
+        painter.drawPicture(0, 0, self.scene)
+
+    def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.__composition.draw_with_affine(affine_matrix, painter)
+
+    def rotate(self, angle_in_degrees: float):
+        pass
+
+    def bounding_rect(self) -> QRectF:
+        return self.__composition.frame_rect()
+
+    def hit_test(self, point: QPointF) -> Optional[Drawable]:
+        return self.__composition.hit_test(point)
+
+
 class MainWidget(QWidget):
     MIN_HEIGHT = 600
     MIN_WIDTH = MIN_HEIGHT * 2
     MARGIN = 10  # размер отступа внутри окна в пикселях
+    NATIVE_AFFINE = True  # отражение выполняет QPainter, а не draw_with_affine
+    RECORD_SCENE = True  # сцена записывается в QPicture один раз и воспроизводится для обеих половин
+    PARTIAL_REPAINT = True  # перерисовываются только изменившиеся области и их отражения
+    THREADED_SIMULATION = False  # симуляция в отдельном потоке, отрисовка читает её снимки
+    IDLE_SCHEDULING = True  # таймер кадров останавливается, пока на сцене ничего не движется
+
+    def __init__(self, title: str, profiler: Optional[FrameProfiler] = None,
+                 replayer: Optional[SceneReplayer] = None, recorder: Optional[SceneRecorder] = None):
+        """replayer: вместо симуляции показываются кадры записи, по одному на шаг.
+        recorder: каждый шаг симуляции записывается (кроме режима THREADED_SIMULATION).
+        """
 
-    def __init__(self, title: str):
         super().__init__()
 
+        self.__profiler = profiler
+        Picture.profiler = profiler
+        self.__replayer = replayer
+        self.__recorder = recorder
+        self.__threaded = self.THREADED_SIMULATION and replayer is None
+
         self.setMinimumSize(self.MIN_WIDTH, self.MIN_HEIGHT)
         self.resize(self.MIN_WIDTH, self.MIN_HEIGHT)
         self.setWindowTitle(title)
 
-        self.__composition = Composition(QRect(), self)
+        self.__composition = Composition(
+            QRect(), self, use_star_field=Composition.USE_STAR_FIELD,
+            threaded_simulation=self.__threaded, replay=replayer is not None,
+            on_button_press=self.wake_up
+        )
+        self.__snapshot = self.__composition.create_snapshot()
+        self.__replay_index = 0
+        self.__layout_size: Optional[QSize] = None
+        self.__layout_rect: Optional[QRect] = None
+
+        # сцена окна: основная половина и её отражение, local_transform которого задаёт раскладка
+        self.__half = CompositionHalf(self.__composition)
+        self.__mirror = Picture([self.__half])
+        self.__scene = Picture([self.__half, self.__mirror])
+
+        self.__clock = SimulationClock(self.__step, 1 / FPS)
+        self.__scheduler = IdleScheduler(
+            self.animation, int(1000 / RENDER_FPS),
+            self.__is_animating if self.IDLE_SCHEDULING else lambda: True,
+            on_wake_up=self.__clock.reset
+        )
 
-        self.__timer = QTimer()
-        self.__timer.timeout.connect(self.animation)
-        self.__timer.start(int(1000 / FPS))
+        self.__composition.start_simulation()
+        if replayer is not None:
+            self.seek(0)
+        self.__scheduler.start()
 
     def animation(self):
-        self.__composition.animation()
-        self.repaint()
+        with self.__measure('animation'):
+            if self.__threaded:
+                alpha = self.__composition.take_snapshot()
+            else:
+                self.__clock.advance()
+                alpha = self.__clock.alpha
+        self.__composition.interpolate(alpha)
+
+        if self.PARTIAL_REPAINT:
+            dirty_region = self.__get_dirty_region(self.__composition.take_dirty_rects())
+            if self.__profiler is not None:
+                dirty_region = dirty_region.united(QRegion(self.__profiler.overlay_rect(self.__get_overlay_position())))
+            if not dirty_region.isEmpty():
+                self.update(dirty_region)
+        else:
+            self.repaint()
 
     def paintEvent(self, event) -> None:
         painter = QPainter()
         painter.begin(self)
         painter.setRenderHint(QPainter.Antialiasing)  # Включение сглаживания
 
-        self.__composition.update_components(self.__get_draw_rect(event))
-
-        affine_matrix = Matrix.reflection('x') * Matrix.transfer(-self.width(), 1)
+        self.draw_frame(painter, self.size(), event.region() if self.PARTIAL_REPAINT else None)
 
-        # Здесь порядок важен, я не знаю почему, но если поменять местами, не работает
-        self.__composition.draw_with_affine(affine_matrix, painter)
-        self.__composition.draw(painter)
+        if self.__profiler is not None:
+            counters = {f'lod {level}': count for level, count in level_of_detail.take_counts().items()}
+            counters.update(
+                (f'flower {kind}', count) for kind, count in self.__composition.take_flower_draw_counts().items()
+            )
+            counters['ticks executed'] = self.__scheduler.executed_ticks
+            counters['ticks skipped'] = self.__scheduler.skipped_ticks
+            self.__profiler.end_frame(self.__composition.stars_count(), counters)
+            self.__profiler.draw_overlay(painter, self.__get_overlay_position())
 
         painter.end()
 
-    def __get_draw_rect(self, event) -> QRect:
-        draw_rect: QRect = event.rect()
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        hit = self.__scene.hit_test(QPointF(event.pos()))
+        if isinstance(hit, CycleButton):
+            hit.press()
+
+    def resizeEvent(self, event) -> None:
+        self.__update_layout(event.size())
+        self.wake_up()
+        super().resizeEvent(event)
+
+    @property
+    def composition(self) -> Composition:
+        return self.__composition
+
+    @property
+    def scheduler(self) -> IdleScheduler:
+        return self.__scheduler
+
+    def wake_up(self):
+        """Возобновляет кадры, если таймер остановлен в простое"""
+
+        self.__scheduler.wake_up()
+
+    def draw_frame(self, painter: QPainter, size: QSize, region: Optional[QRegion] = None):
+        """Рисует обе половины кадра размером size на любом устройстве, не только на окне.
+
+        region: перерисовываемая часть кадра; компоненты вне неё пропускаются.
+        """
+
+        # обычно раскладка уже сделана в resizeEvent; заново - только для другого размера
+        with self.__measure('update_components'):
+            affine_matrix = self.__update_layout(size)
+
+        if region is not None:
+            painter.save()
+            painter.setClipRegion(region)
+
+        self.__half.scene = None
+        if self.RECORD_SCENE:
+            with self.__measure('record'):
+                self.__half.scene = self.__record_scene(
+                    self.__get_scene_clip(region, size, affine_matrix) if region is not None else None
+                )
+
+        with self.__measure('draw_with_affine'):
+            if self.RECORD_SCENE or self.NATIVE_AFFINE:
+                self.__mirror.draw(painter)
+            else:
+                # Здесь порядок важен, я не знаю почему, но если поменять местами, не работает
+                self.__mirror.draw_with_affine(Matrix.identity(), painter)
+        with self.__measure('draw'):
+            self.__half.draw(painter)
+
+        if region is not None:
+            painter.restore()
+
+    def seek(self, index: int):
+        """Показывает кадр записи index; следующие шаги продолжают воспроизведение с него"""
+
+        self.__replay_index = index % len(self.__replayer)
+        self.__replayer.read(self.__replay_index, self.__snapshot)
+        self.__composition.show_snapshot(self.__snapshot)
+
+    def closeEvent(self, event) -> None:
+        self.__scheduler.stop()
+        self.__composition.stop_simulation()
+        if self.__recorder is not None:
+            self.__recorder.close()
+        if self.__profiler is not None:
+            self.__profiler.close()
+        super().closeEvent(event)
+
+    def __is_animating(self) -> bool:
+        # запись и воспроизведение идут по шагам симуляции, простой сдвинул бы их время
+        return self.__replayer is not None or self.__recorder is not None or self.__composition.is_animating()
+
+    def __step(self):
+        if self.__replayer is not None:
+            self.seek(self.__replay_index + 1)
+            return
+
+        self.__composition.animation()
+        if self.__recorder is not None:
+            self.__composition.write_snapshot(self.__snapshot)
+            self.__recorder.record(self.__snapshot)
+
+    def __measure(self, phase: str):
+        if self.__profiler is None:
+            return nullcontext()
+
+        return self.__profiler.measure(phase)
+
+    def __get_overlay_position(self) -> QPoint:
+        return QPoint(self.MARGIN * 2, self.MARGIN * 2)
+
+    def record_frame(self, size: QSize) -> QPicture:
+        """Записывает обе половины кадра размером size без растровых кэшей, например для TiledRenderer.
+
+        Раскладка под size временная: после записи композиция снова разложена под окно.
+        """
+
+        affine_matrix = self.__update_layout(size)
+
+        scene = QPicture()
+        recorder = QPainter()
+        recorder.begin(scene)
+        recorder.setRenderHint(QPainter.Antialiasing)
+        self.__composition.draw_scene(recorder, affine_matrix)
+        recorder.end()
+
+        # иначе кнопка и рамка отсечения звёзд остались бы разложены под постер
+        self.__update_layout(self.size())
+        return scene
+
+    @classmethod
+    def draw_rect_for(cls, size: QSize) -> QRect:
+        """Область основной (левой) половины окна размером size"""
+
+        draw_rect = QRect()
         draw_rect.setCoords(
-            self.MARGIN, self.MARGIN,
-            int(self.width() / 2 - self.MARGIN), self.height() - self.MARGIN
+            cls.MARGIN, cls.MARGIN,
+            int(size.width() / 2 - cls.MARGIN), size.height() - cls.MARGIN
         )
 
         return draw_rect
 
+    @staticmethod
+    def affine_matrix_for(size: QSize) -> Matrix:
+        """Отражение основной половины во вторую для окна размером size"""
+
+        return Matrix.reflection('x') * Matrix.transfer(-size.width(), 1)
+
+    def __get_affine_matrix(self) -> Matrix:
+        return self.__update_layout(self.size())
+
+    def __update_layout(self, size: QSize) -> Matrix:
+        """Раскладывает композицию под размер size, если он изменился, и возвращает отражение для него"""
+
+        if size != self.__layout_size:
+            self.__layout_size = QSize(size)
+            self.__layout_rect = self.draw_rect_for(size)
+            self.__mirror.local_transform = self.affine_matrix_for(size)
+
+        # композицию могли разложить под другой прямоугольник снаружи, при совпадении это проверка без работы
+        self.__composition.update_components(self.__layout_rect)
+        return self.__mirror.local_transform
+
+    def __get_dirty_region(self, rects: List[QRectF]) -> QRegion:
+        transform = self.__get_affine_matrix().to_qtransform()
+
+        region = QRegion()
+        for rect in rects:
+            region = region.united(QRegion(rect.toAlignedRect()))
+            region = region.united(QRegion(transform.mapRect(rect).toAlignedRect()))
+
+        return region
+
+    @staticmethod
+    def __get_scene_clip(region: QRegion, size: QSize, affine_matrix: Matrix) -> QRect:
+        """Часть основной половины, которая видна в region в любой из половин"""
+
+        # отражение обратно самому себе, поэтому переводит и вторую половину в основную
+        scene_region = region.united(affine_matrix.to_qtransform().map(region))
+        return scene_region.intersected(QRect(0, 0, (size.width() + 1) // 2, size.height())).boundingRect()
+
+    def __record_scene(self, clip: Optional[QRect] = None) -> QPicture:
+        """clip: записываются только компоненты, пересекающие эту область"""
+
+        scene = QPicture()
+
+        recorder = QPainter()
+        recorder.begin(scene)
+        recorder.setRenderHint(QPainter.Antialiasing)
+        if clip is not None:
+            # при воспроизведении IntersectClip сужает отсечение painter, а ReplaceClip заменил бы его
+            recorder.setClipRect(clip, Qt.IntersectClip)
+        # статический слой уже растеризован, в QPicture он попал бы целиком как изображение
+        self.__composition.draw_components(recorder)
+        recorder.end()
+
+        return scene
+
 
 if __name__ == '__main__':
     app = QApplication([])
 
     pw = PictureWidget()
-    window = MainWidget('Лабораторная работа №3')
+    # CG3_PROFILE=1 включает оверлей с замерами, CG3_PROFILE_DUMP=путь - запись кадров в JSON lines
+    profiler = FrameProfiler(dump_path=os.environ.get('CG3_PROFILE_DUMP')) \
+        if os.environ.get('CG3_PROFILE') else None
+    # CG3_RECORD=путь записывает шаги симуляции, CG3_REPLAY=путь воспроизводит запись
+    recorder = SceneRecorder(os.environ['CG3_RECORD']) if os.environ.get('CG3_RECORD') else None
+    replayer = SceneReplayer(os.environ['CG3_REPLAY']) if os.environ.get('CG3_REPLAY') else None
+    window = MainWidget('Лабораторная работа №3', profiler, replayer, recorder)
 
     window.show()
     app.exec_()
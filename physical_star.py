@@ -1,12 +1,30 @@
-from PyQt5.QtCore import QPointF, QRect, QLine
+import numpy as np
+from PyQt5.QtCore import QPointF, QRect
+from PyQt5.QtGui import QPen, QBrush
 
-from graphics.figures import Star, rotate_point
+from graphics.figures import Star
 from graphics.matrix import Matrix
-from graphics.modifications import increase_angle, affine_to_point, distance_between_points
+from graphics.modifications import increase_angle, affine_to_point, rotate_points
+from graphics.styles import style_cache
 
 
 class PhysicalStar(Star):
     POINTS_COUNT = 4
+    # запись состояния одной звезды фиксированной ширины, порядок полей как в to_record()
+    RECORD_DTYPE = np.dtype([
+        ('center', '<f4', 2), ('previous_center', '<f4', 2), ('inner_rotation', '<f4'),
+        ('inner_radius', '<f4'), ('outer_radius', '<f4'),
+        ('inner_angle_speed', '<f4'), ('outer_angle_speed', '<f4'),
+        ('distance_speed', '<f4'), ('distance_coeff', '<f4'),
+        ('alpha', 'u1'), ('age', '<u4'),
+    ])
+
+    __slots__ = (
+        '__inner_angle_speed', '__outer_angle_speed', '__inner_rotation',
+        '__distance_speed', '__distance_coeff', '__age',
+        '__previous_x', '__previous_y',  # центр на прошлом шаге; два float легче ещё одного QPointF
+        '__display_vertices',
+    )
 
     def __init__(self, inner_radius: float, outer_radius: float,
                  inner_angle_speed: float, outer_angle_speed: float,
@@ -15,27 +33,78 @@ class PhysicalStar(Star):
         super().__init__(inner_radius, outer_radius, PhysicalStar.POINTS_COUNT,
                          *args, **kwargs)
 
+        self.__init_motion(inner_angle_speed, outer_angle_speed, distance_speed)
+
+    def reset(self, inner_radius: float, outer_radius: float,
+              inner_angle_speed: float, outer_angle_speed: float, distance_speed: float,
+              center: QPointF, pen: QPen, brush: QBrush):
+        """Возвращает звезду в состояние только что созданной, чтобы использовать её повторно"""
+
+        self.pen = pen
+        self.brush = brush
+        self.set_radiuses(inner_radius, outer_radius)
+        self.place(center, 0)
+        self.__init_motion(inner_angle_speed, outer_angle_speed, distance_speed)
+
+    def __init_motion(self, inner_angle_speed: float, outer_angle_speed: float, distance_speed: float):
         self.__inner_angle_speed = inner_angle_speed
         self.__outer_angle_speed = outer_angle_speed
 
-        self.__inner_rotation = self.__outer_rotation = 0
+        self.__inner_rotation = 0
         self.__distance_speed = distance_speed
         self.__distance_coeff = 0.1 * self.__distance_speed
-        self.__counter = 1
+        self.__age = 0
+        self.__previous_x, self.__previous_y = self.center.x(), self.center.y()
+        self.__display_vertices = None
 
     def animation(self, center_of_rotation: QPointF, draw_rect: QRect):
+        self.__previous_x, self.__previous_y = self.center.x(), self.center.y()
+        self.__display_vertices = None
+        self.__age += 1
+
         self.__update_color(draw_rect)
         self.__update_characteristics()
-        self.__affine_transformations(center_of_rotation)
+        self.place(self.__affine_transformations(center_of_rotation), self.__inner_rotation)
 
-        self._init_points()
-        for point in self.get_points():
-            rotate_point(point, self.center, self.__inner_rotation)
+    @property
+    def age(self) -> int:
+        """Количество прожитых шагов симуляции"""
+        return self.__age
+
+    def to_record(self) -> tuple:
+        """Состояние звезды в порядке полей RECORD_DTYPE"""
+
+        return (
+            (self.center.x(), self.center.y()), (self.__previous_x, self.__previous_y),
+            self.__inner_rotation, self.inner_radius, self.outer_radius,
+            self.__inner_angle_speed, self.__outer_angle_speed, self.__distance_speed, self.__distance_coeff,
+            self.brush.color().alpha(), self.__age
+        )
+
+    def interpolate(self, alpha: float):
+        if alpha >= 1:
+            self.__display_vertices = None
+            return
+
+        center = self.center
+        self.__display_vertices = rotate_points(
+            self.get_vertices(), center, -(1 - alpha) * self.__inner_angle_speed
+        ) + ((self.__previous_x - center.x()) * (1 - alpha), (self.__previous_y - center.y()) * (1 - alpha))
+
+    def get_display_vertices(self) -> np.ndarray:
+        if self.__display_vertices is None:
+            return self.get_vertices()
+
+        return self.__display_vertices
 
     def is_alive(self, draw_rect: QRect) -> bool:
         """Возвращает True, если звезда находится внутри draw_rect"""
 
-        return all(draw_rect.contains(point.toPoint()) for point in self.get_points())
+        vertices = np.round(self.get_vertices())
+        return bool(np.all(
+            (vertices[:, 0] >= draw_rect.left()) & (vertices[:, 0] <= draw_rect.right()) &
+            (vertices[:, 1] >= draw_rect.top()) & (vertices[:, 1] <= draw_rect.bottom())
+        ))
 
     def __update_characteristics(self):
         self.__inner_rotation = increase_angle(self.__inner_rotation, self.__inner_angle_speed)
@@ -43,9 +112,8 @@ class PhysicalStar(Star):
         self.__distance_speed += self.__distance_coeff
         self.__outer_angle_speed *= 0.99
         # self.__distance_speed *= 0.9999
-        # self.__counter -= 0.0001 * self.__outer_angle_speed
 
-    def __affine_transformations(self, center_of_rotation: QPointF):
+    def __affine_transformations(self, center_of_rotation: QPointF) -> QPointF:
 
         distance_vector = \
             (
@@ -54,15 +122,12 @@ class PhysicalStar(Star):
                     center_of_rotation
             ) / 30
 
-        outer_rotate_matrix = \
-            Matrix.transfer(
-                center_of_rotation.x() + distance_vector.x(),
-                center_of_rotation.y() + distance_vector.y()
-            ) * \
-            Matrix.rotate(self.__outer_angle_speed) * \
-            Matrix.transfer(-center_of_rotation.x(), -center_of_rotation.y())
+        outer_rotate_matrix = Matrix.rotate_around(
+            center_of_rotation.x(), center_of_rotation.y(), self.__outer_angle_speed,
+            distance_vector.x(), distance_vector.y()
+        )
 
-        self.center = affine_to_point(self.center, outer_rotate_matrix)
+        return affine_to_point(self.center, outer_rotate_matrix)
 
     def __update_color(self, draw_rect: QRect):
         distance = min(
@@ -77,9 +142,5 @@ class PhysicalStar(Star):
 
         # чем меньше distance тем меньше alpha_value
         alpha_value = int(distance - 15)
-        pen_color = self.pen.color()
-        pen_color.setAlpha(alpha_value)
-        brush_color = self.brush.color()
-        brush_color.setAlpha(alpha_value)
-        self.pen.setColor(pen_color)
-        self.brush.setColor(brush_color)
+        self.pen = style_cache.pen_with_alpha(self.pen, alpha_value)
+        self.brush = style_cache.brush_with_alpha(self.brush, alpha_value)
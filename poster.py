@@ -0,0 +1,63 @@
+"""Постер: один кадр композиции в большом разрешении, растеризованный по плиткам.
+
+    python poster.py --output poster.png
+    python poster.py --width 15360 --height 8640 --steps 600 --workers 8 --output poster.png
+
+Симуляция делает --steps шагов без окна и таймера, затем кадр записывается
+в QPicture без растровых кэшей и растеризуется TiledRenderer в --workers потоках.
+"""
+import argparse
+import os
+import random
+import time
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtWidgets import QApplication
+
+from graphics.tiled_rendering import TiledRenderer
+from main import MainWidget
+
+DEFAULT_SIZE = 7680, 4320
+DEFAULT_STEPS = 150  # шагов симуляции до записи кадра, чтобы появились звёзды
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--width', type=int, default=DEFAULT_SIZE[0])
+    parser.add_argument('--height', type=int, default=DEFAULT_SIZE[1])
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS)
+    parser.add_argument('--workers', type=int, default=None, help='потоков растеризации, по умолчанию по числу ядер')
+    parser.add_argument('--tile-size', type=int, default=TiledRenderer.TILE_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication([])
+    random.seed(args.seed)
+
+    size = QSize(args.width, args.height)
+    window = MainWidget('poster')
+    window.scheduler.stop()
+    window.composition.update_components(MainWidget.draw_rect_for(size))
+    window.composition.press_button()
+    for _ in range(args.steps):
+        window.composition.animation()
+
+    renderer = TiledRenderer(args.workers, args.tile_size, background=window.palette().window().color())
+
+    start = time.perf_counter()
+    image = renderer.render(window.record_frame(size), size)
+    seconds = time.perf_counter() - start
+
+    if not image.save(args.output):
+        raise OSError(f'Не удалось записать {args.output}')
+
+    print(f'{args.width}x{args.height} with {window.composition.stars_count()} stars in {seconds:.2f} s, '
+          f'{renderer.workers_count} workers')
+
+    del app
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Запись шагов симуляции в компактный двоичный файл и воспроизведение через mmap.
+
+Формат (little-endian):
+    заголовок HEADER_DTYPE;
+    кадры подряд: FRAME_DTYPE и stars_count записей StarField.RECORD_DTYPE;
+    индекс: смещения кадров, uint64 на кадр;
+    хвост FOOTER_DTYPE со смещением индекса и числом кадров.
+
+    python recording.py record run.cg3 --frames 3000 --seed 1
+    python recording.py render run.cg3 --frame 1500 --image frame.png
+"""
+import argparse
+import mmap
+import os
+import random
+from typing import BinaryIO, List
+
+import numpy as np
+
+from scene_simulation import SceneSnapshot
+from star_field import StarField
+
+MAGIC = b'CG3REC'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([('magic', 'S6'), ('version', '<u2'), ('star_record_size', '<u4')])
+FRAME_DTYPE = np.dtype([
+    ('step_index', '<u8'), ('flower_rotation', '<f8'), ('flower_rotation_step', '<f4'),
+    ('enabled', 'u1'), ('stars_count', '<u4'),
+])
+FOOTER_DTYPE = np.dtype([('index_offset', '<u8'), ('frames_count', '<u8')])
+
+
+class SceneRecorder:
+    """Дописывает снимки сцены в файл; индекс кадров пишется при закрытии"""
+
+    def __init__(self, path: str):
+        self.__file: BinaryIO = open(path, 'wb')
+        self.__offsets: List[int] = []
+
+        header = np.zeros(1, HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, StarField.RECORD_DTYPE.itemsize)
+        self.__file.write(header.tobytes())
+
+    def __enter__(self) -> 'SceneRecorder':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def frames_count(self) -> int:
+        return len(self.__offsets)
+
+    def record(self, snapshot: SceneSnapshot):
+        stars = snapshot.stars.to_records()
+
+        frame = np.zeros(1, FRAME_DTYPE)
+        frame[0] = (
+            snapshot.step_index, snapshot.flower_rotation, snapshot.flower_rotation_step,
+            snapshot.enabled, len(stars)
+        )
+
+        self.__offsets.append(self.__file.tell())
+        self.__file.write(frame.tobytes())
+        self.__file.write(stars.tobytes())
+
+    def close(self):
+        if self.__file.closed:
+            return
+
+        index_offset = self.__file.tell()
+        self.__file.write(np.array(self.__offsets, dtype='<u8').tobytes())
+
+        footer = np.zeros(1, FOOTER_DTYPE)
+        footer[0] = (index_offset, len(self.__offsets))
+        self.__file.write(footer.tobytes())
+        self.__file.close()
+
+
+class SceneReplayer:
+    """Читает кадры записи через mmap: поиск кадра - одно обращение к индексу, без пересчёта симуляции"""
+
+    def __init__(self, path: str):
+        self.__file = open(path, 'rb')
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = np.frombuffer(self.__map, HEADER_DTYPE, count=1)[0]
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise ValueError(f'{path} не является записью версии {VERSION}')
+        if header['star_record_size'] != StarField.RECORD_DTYPE.itemsize:
+            raise ValueError(f'{path} записан с другим форматом звёзд')
+
+        footer = np.frombuffer(self.__map, FOOTER_DTYPE, count=1, offset=len(self.__map) - FOOTER_DTYPE.itemsize)[0]
+        self.__offsets = np.frombuffer(
+            self.__map, '<u8', count=int(footer['frames_count']), offset=int(footer['index_offset'])
+        )
+
+    def __enter__(self) -> 'SceneReplayer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    def read(self, index: int, snapshot: SceneSnapshot):
+        """Записывает кадр index в snapshot; звёзды копируются из файла без промежуточных массивов"""
+
+        offset = int(self.__offsets[index])
+        frame = np.frombuffer(self.__map, FRAME_DTYPE, count=1, offset=offset)[0]
+        stars = np.frombuffer(
+            self.__map, StarField.RECORD_DTYPE, count=int(frame['stars_count']), offset=offset + FRAME_DTYPE.itemsize
+        )
+
+        snapshot.stars.load_records(stars)
+        snapshot.flower_rotation = float(frame['flower_rotation'])
+        snapshot.flower_rotation_step = float(frame['flower_rotation_step'])
+        snapshot.enabled = bool(frame['enabled'])
+        snapshot.step_index = int(frame['step_index'])
+
+    def close(self):
+        if self.__map.closed:
+            return
+
+        # представления numpy держат буфер mmap, их нужно отпустить до закрытия
+        self.__offsets = None
+        self.__map.close()
+        self.__file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='записать шаги симуляции без окна')
+    record_parser.add_argument('path')
+    record_parser.add_argument('--frames', type=int, default=1000)
+    record_parser.add_argument('--seed', type=int, default=0)
+
+    render_parser = commands.add_parser('render', help='нарисовать один кадр записи в изображение')
+    render_parser.add_argument('path')
+    render_parser.add_argument('--frame', type=int, required=True)
+    render_parser.add_argument('--image', required=True)
+    render_parser.add_argument('--width', type=int, default=1200)
+    render_parser.add_argument('--height', type=int, default=600)
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QApplication
+    from main import MainWidget
+
+    app = QApplication([])
+
+    if args.command == 'record':
+        random.seed(args.seed)
+        window = MainWidget('recording')
+        window.composition.update_components(MainWidget.draw_rect_for(window.size()))
+        window.composition.press_button()
+
+        snapshot = window.composition.create_snapshot()
+        with SceneRecorder(args.path) as recorder:
+            for _ in range(args.frames):
+                window.composition.animation()
+                window.composition.write_snapshot(snapshot)
+                recorder.record(snapshot)
+
+        print(f'{args.frames} frames, {os.path.getsize(args.path)} bytes')
+    else:
+        with SceneReplayer(args.path) as replayer:
+            window = MainWidget('replay', replayer=replayer)
+            window.seek(args.frame)
+
+            size = QSize(args.width, args.height)
+            image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+            image.fill(window.palette().window().color())
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.Antialiasing)
+            window.draw_frame(painter, size)
+            painter.end()
+            image.save(args.image)
+
+    del app
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import random
+from collections import deque
+from time import monotonic
+from typing import Callable, Deque, Dict
+
+from PyQt5.QtCore import QPointF, QRect
+from PyQt5.QtGui import QPen, QBrush
+
+from graphics.modifications import increase_angle
+from star_field import StarField
+
+
+class SceneSnapshot:
+    """Состояние сцены после шага симуляции.
+
+    Опубликованный снимок симуляция не изменяет, пока его может читать отрисовка.
+    """
+
+    def __init__(self, pen: QPen, brush: QBrush):
+        self.stars = StarField(pen, brush)
+        self.flower_rotation = 0.0
+        self.flower_rotation_step = 0.0
+        self.enabled = False
+        self.step_index = 0
+        self.time = 0.0  # момент публикации по monotonic()
+
+
+class SceneSimulation:
+    """Шаги симуляции вентилятора и звёзд без обращения к виджетам.
+
+    Методы toggle_enabled и set_layout можно вызывать из любого потока: они только
+    кладут команду в очередь, которая разбирается в начале следующего шага.
+    """
+
+    def __init__(self, star_field: StarField, steps_per_second: int, rotation_step: float,
+                 spawn_chance: float, max_stars_count: int):
+        self.__stars = star_field
+        self.__steps_per_second = steps_per_second
+        self.__rotation_step = rotation_step
+        self.__spawn_chance = spawn_chance
+        self.__max_stars_count = max_stars_count
+
+        # deque.append и deque.popleft атомарны, блокировка не нужна
+        self.__commands: Deque[Callable[[], None]] = deque()
+
+        self.__enabled = False
+        self.__flower_rotation = 0.0
+        self.__flower_rotation_step = 0.0
+        self.__draw_rect = QRect()
+        self.__flower_center = QPointF()
+        self.__core_radius = 0.0
+        self.__step_index = 0
+
+    @property
+    def stars(self) -> StarField:
+        return self.__stars
+
+    @staticmethod
+    def random_star_parameters(core_radius: float, steps_per_second: int) -> Dict[str, float]:
+        return dict(
+            inner_radius=core_radius * 0.25, outer_radius=core_radius,
+            inner_angle_speed=random.randint(1, 355) / steps_per_second,
+            outer_angle_speed=random.randint(1, steps_per_second),
+            distance_speed=random.randint(steps_per_second, steps_per_second + 10)
+        )
+
+    @staticmethod
+    def spawn_count(spawn_chance: float) -> int:
+        """Сколько звёзд создать за шаг: целая часть spawn_chance и ещё одна с вероятностью дробной"""
+
+        return int(spawn_chance) + (spawn_chance % 1 >= random.random())
+
+    def toggle_enabled(self):
+        self.__commands.append(self.__toggle_enabled)
+
+    def set_layout(self, draw_rect: QRect, flower_center: QPointF, core_radius: float):
+        draw_rect, flower_center = QRect(draw_rect), QPointF(flower_center)
+        self.__commands.append(lambda: self.__set_layout(draw_rect, flower_center, core_radius))
+
+    def step(self):
+        while self.__commands:
+            self.__commands.popleft()()
+
+        self.__flower_rotation_step = self.__rotation_step if self.__enabled else 0
+        self.__flower_rotation = increase_angle(self.__flower_rotation, self.__flower_rotation_step)
+
+        if self.__enabled and len(self.__stars) <= self.__max_stars_count:
+            for _ in range(self.spawn_count(self.__spawn_chance)):
+                self.__stars.add_star(
+                    center=self.__flower_center,
+                    **self.random_star_parameters(self.__core_radius, self.__steps_per_second)
+                )
+
+        self.__stars.animation(self.__flower_center, self.__draw_rect)
+        self.__step_index += 1
+
+    def write_snapshot(self, snapshot: SceneSnapshot):
+        snapshot.stars.copy_from(self.__stars)
+        snapshot.flower_rotation = self.__flower_rotation
+        snapshot.flower_rotation_step = self.__flower_rotation_step
+        snapshot.enabled = self.__enabled
+        snapshot.step_index = self.__step_index
+        snapshot.time = monotonic()
+
+    def __toggle_enabled(self):
+        self.__enabled = not self.__enabled
+
+    def __set_layout(self, draw_rect: QRect, flower_center: QPointF, core_radius: float):
+        self.__draw_rect = draw_rect
+        self.__flower_center = flower_center
+        self.__core_radius = core_radius
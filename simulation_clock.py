@@ -0,0 +1,69 @@
+from time import monotonic
+from typing import Callable
+
+
+class SimulationClock:
+    """Вызывает step с фиксированным шагом dt независимо от частоты отрисовки"""
+
+    MAX_STEPS_PER_ADVANCE = 5
+
+    def __init__(self, step: Callable[[], None], dt: float,
+                 max_steps: int = MAX_STEPS_PER_ADVANCE, time_source: Callable[[], float] = monotonic):
+        self.__step = step
+        self.__dt = dt
+        self.__max_steps = max_steps
+        self.__time_source = time_source
+
+        self.__last_time = None
+        self.__accumulator = 0.0
+        self.__steps_count = 0
+        self.__dropped_time = 0.0
+
+    @property
+    def dt(self) -> float:
+        return self.__dt
+
+    @property
+    def alpha(self) -> float:
+        """Доля шага, прошедшая после последнего шага симуляции, в [0, 1)"""
+
+        return self.__accumulator / self.__dt
+
+    @property
+    def steps_count(self) -> int:
+        return self.__steps_count
+
+    @property
+    def dropped_time(self) -> float:
+        """Время в секундах, отброшенное из-за ограничения max_steps"""
+
+        return self.__dropped_time
+
+    def reset(self):
+        self.__last_time = None
+        self.__accumulator = 0.0
+
+    def advance(self) -> int:
+        """Выполняет накопившиеся шаги симуляции и возвращает их количество"""
+
+        now = self.__time_source()
+        if self.__last_time is None:
+            self.__last_time = now - self.__dt
+
+        self.__accumulator += now - self.__last_time
+        self.__last_time = now
+
+        steps = 0
+        while self.__accumulator >= self.__dt and steps < self.__max_steps:
+            self.__step()
+            self.__accumulator -= self.__dt
+            steps += 1
+
+        # при слишком долгом кадре не догоняем бесконечно, а отбрасываем отставание
+        if self.__accumulator >= self.__dt:
+            dropped = self.__accumulator - self.__accumulator % self.__dt
+            self.__dropped_time += dropped
+            self.__accumulator -= dropped
+
+        self.__steps_count += steps
+        return steps
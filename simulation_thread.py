@@ -0,0 +1,80 @@
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+
+from scene_simulation import SceneSimulation, SceneSnapshot
+from simulation_clock import SimulationClock
+
+
+class SnapshotBuffer:
+    """Тройной буфер снимков: писатель и читатель никогда не держат один и тот же снимок.
+
+    Блокировка защищает только обмен индексами, копирование массивов и отрисовка идут без неё.
+    """
+
+    SIZE = 3
+
+    def __init__(self, factory: Callable[[], SceneSnapshot]):
+        self.__snapshots: List[SceneSnapshot] = [factory() for _ in range(self.SIZE)]
+        self.__lock = Lock()
+        self.__back = 0
+        self.__latest: Optional[int] = None
+        self.__reading: Optional[int] = None
+        self.__published_count = 0
+
+    @property
+    def published_count(self) -> int:
+        return self.__published_count
+
+    def back(self) -> SceneSnapshot:
+        """Снимок, в который писатель записывает следующий шаг"""
+
+        return self.__snapshots[self.__back]
+
+    def publish(self):
+        with self.__lock:
+            self.__latest = self.__back
+            self.__back = next(
+                i for i in range(self.SIZE) if i != self.__latest and i != self.__reading
+            )
+            self.__published_count += 1
+
+    def acquire_latest(self) -> Optional[SceneSnapshot]:
+        """Последний опубликованный снимок; он не перезаписывается до следующего вызова"""
+
+        with self.__lock:
+            if self.__latest is None:
+                return None
+
+            self.__reading = self.__latest
+            return self.__snapshots[self.__reading]
+
+
+class SimulationThread(Thread):
+    """Выполняет шаги SceneSimulation с фиксированной частотой и публикует снимки в SnapshotBuffer"""
+
+    def __init__(self, simulation: SceneSimulation, buffer: SnapshotBuffer, dt: float):
+        super().__init__(name='simulation', daemon=True)
+        self.__simulation = simulation
+        self.__buffer = buffer
+        self.__clock = SimulationClock(self.__step, dt)
+        self.__stop_event = Event()
+
+    @property
+    def clock(self) -> SimulationClock:
+        return self.__clock
+
+    def run(self):
+        while not self.__stop_event.is_set():
+            self.__clock.advance()
+            # спим до следующего шага, stop() прерывает ожидание
+            self.__stop_event.wait(self.__clock.dt * (1 - self.__clock.alpha))
+
+    def stop(self):
+        self.__stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def __step(self):
+        self.__simulation.step()
+        self.__simulation.write_snapshot(self.__buffer.back())
+        self.__buffer.publish()
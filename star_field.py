@@ -0,0 +1,330 @@
+from math import pi
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtCore import QPointF, QRect, QRectF, Qt
+from PyQt5.QtGui import QPainter, QPen, QBrush, QPolygonF
+
+from graphics.figures import Drawable
+from graphics.lod import LevelOfDetail, level_of_detail, simplify_vertices, squares
+from graphics.matrix import Matrix
+from graphics.modifications import vertices_bounding_rect, with_pen_margin, array_to_points
+from graphics.spatial_grid import SpatialGrid
+from graphics.styles import style_cache
+from physical_star import PhysicalStar
+from star_interactions import StarInteractions
+
+
+class StarField(Drawable):
+    """Множество звёзд с поведением PhysicalStar, хранимое в виде массивов NumPy"""
+
+    POINTS_COUNT = PhysicalStar.POINTS_COUNT
+    RECORD_DTYPE = PhysicalStar.RECORD_DTYPE
+    INITIAL_CAPACITY = 64
+
+    # единичные направления на вершины звезды, общие для всех звёзд
+    __ANGLES = np.arange(POINTS_COUNT * 2) * (pi / POINTS_COUNT)
+    __UNIT_X = np.cos(__ANGLES)
+    __UNIT_Y = np.sin(__ANGLES)
+
+    def __init__(self, pen: QPen = QPen(), brush: QBrush = QBrush(),
+                 interactions: Optional[StarInteractions] = None):
+        self.__pen = QPen(pen)
+        self.__brush = QBrush(brush)
+        self.__interactions = interactions
+        self.__grid = SpatialGrid(0)
+        self.__size = 0
+        self.__vertices = None
+        self.__display_vertices = None
+        self.__interpolation = 1.0
+        self.__bounds = self.__bounds_vertices = None  # прямоугольник и вершины, по которым он посчитан
+
+        capacity = self.INITIAL_CAPACITY
+        self.__centers = np.empty((capacity, 2))
+        self.__previous_centers = np.empty((capacity, 2))
+        self.__inner_radiuses = np.empty(capacity)
+        self.__outer_radiuses = np.empty(capacity)
+        self.__inner_rotations = np.empty(capacity)
+        self.__inner_angle_speeds = np.empty(capacity)
+        self.__outer_angle_speeds = np.empty(capacity)
+        self.__distance_speeds = np.empty(capacity)
+        self.__distance_coeffs = np.empty(capacity)
+        self.__alphas = np.empty(capacity, dtype=np.int32)
+        self.__ages = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def centers(self) -> np.ndarray:
+        return self.__centers[:self.__size]
+
+    @property
+    def alphas(self) -> np.ndarray:
+        return self.__alphas[:self.__size]
+
+    def add_star(self, center: QPointF, inner_radius: float, outer_radius: float,
+                 inner_angle_speed: float, outer_angle_speed: float, distance_speed: float):
+        if self.__size == len(self.__alphas):
+            self.__grow()
+
+        i = self.__size
+        self.__centers[i] = self.__previous_centers[i] = (center.x(), center.y())
+        self.__inner_radiuses[i] = inner_radius
+        self.__outer_radiuses[i] = outer_radius
+        self.__inner_rotations[i] = 0
+        self.__inner_angle_speeds[i] = inner_angle_speed
+        self.__outer_angle_speeds[i] = outer_angle_speed
+        self.__distance_speeds[i] = distance_speed
+        self.__distance_coeffs[i] = 0.1 * distance_speed
+        self.__alphas[i] = self.__brush.color().alpha()
+        self.__ages[i] = 0
+
+        self.__size += 1
+        self.__vertices = self.__display_vertices = None
+
+    def copy_from(self, other: 'StarField'):
+        """Копирует состояние звёзд other, переиспользуя уже выделенную память"""
+
+        n = len(other)
+        while len(self.__alphas) < n:
+            self.__grow()
+
+        for target, source in zip(self.__arrays(), other.__arrays()):
+            target[:n] = source[:n]
+
+        self.__size = n
+        self.__vertices = self.__display_vertices = None
+        self.__interpolation = 1.0
+
+    def to_records(self) -> np.ndarray:
+        """Состояние звёзд структурированным массивом RECORD_DTYPE"""
+
+        n = self.__size
+        records = np.empty(n, self.RECORD_DTYPE)
+        for name, array in self.__record_fields():
+            records[name] = array[:n]
+
+        return records
+
+    def load_records(self, records: np.ndarray):
+        """Заменяет звёзды записанными в records, переиспользуя уже выделенную память"""
+
+        n = len(records)
+        while len(self.__alphas) < n:
+            self.__grow()
+
+        for name, array in self.__record_fields():
+            array[:n] = records[name]
+
+        self.__size = n
+        self.__vertices = self.__display_vertices = None
+        self.__interpolation = 1.0
+
+    def animation(self, center_of_rotation: QPointF, draw_rect: QRect):
+        """Один шаг симуляции всех звёзд с удалением вышедших за draw_rect"""
+
+        n = self.__size
+        if n == 0:
+            return
+
+        centers = self.__centers[:n]
+        self.__previous_centers[:n] = centers
+        self.__update_alphas(centers, draw_rect)
+        self.__update_characteristics(n)
+
+        # перенос + поворот вокруг center_of_rotation, как в PhysicalStar.__affine_transformations
+        pivot = np.array((center_of_rotation.x(), center_of_rotation.y()))
+        distance_vectors = (centers + self.__distance_speeds[:n, np.newaxis] - pivot) / 30
+        angles = np.radians(self.__outer_angle_speeds[:n])
+        cos_fi, sin_fi = np.cos(angles), np.sin(angles)
+        diff = centers - pivot
+        centers[:, 0] = pivot[0] + distance_vectors[:, 0] + diff[:, 0] * cos_fi - diff[:, 1] * sin_fi
+        centers[:, 1] = pivot[1] + distance_vectors[:, 1] + diff[:, 0] * sin_fi + diff[:, 1] * cos_fi
+
+        self.__ages[:n] += 1
+        outer_radiuses = self.__outer_radiuses[:n]
+        self.__grid.rebuild(centers, StarInteractions.cell_size(outer_radiuses))
+
+        alive = np.ones(n, dtype=bool)
+        max_shift = 0.0
+        if self.__interactions is not None:
+            displacements, merges = self.__interactions.step(self.__grid, centers, outer_radiuses, self.__ages[:n])
+            centers += displacements
+            max_shift = float(np.hypot(*displacements.T).max())
+            for keep, absorbed in merges:
+                self.__merge(keep, absorbed)
+                alive[absorbed] = False
+
+        self.__vertices = self.__display_vertices = None
+        self.__interpolation = 1.0
+        self.__cull(draw_rect, alive, float(outer_radiuses.max()) + max_shift + 1)
+
+    def draw(self, painter: QPainter):
+        self.__draw_vertices(self.__get_display_vertices(), LevelOfDetail.scale(painter), painter)
+
+    def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        vertices = self.__get_display_vertices()
+        transformed = affine_matrix.apply_to_points(vertices.reshape(-1, 2)).reshape(vertices.shape)
+        self.__draw_vertices(transformed, LevelOfDetail.scale(painter, affine_matrix), painter)
+
+    def bounding_rect(self) -> QRectF:
+        vertices = self.__get_display_vertices()
+        if vertices is not self.__bounds_vertices:
+            self.__bounds = with_pen_margin(vertices_bounding_rect(vertices.reshape(-1, 2)), self.__pen)
+            self.__bounds_vertices = vertices
+
+        return self.__bounds
+
+    def rotate(self, angle_in_degrees: float):
+        self.__inner_rotations[:self.__size] += angle_in_degrees
+        self.__vertices = self.__display_vertices = None
+
+    def interpolate(self, alpha: float):
+        self.__interpolation = alpha
+        self.__display_vertices = None
+
+    def get_vertices(self) -> np.ndarray:
+        """Вершины всех звёзд, массив формы (N, POINTS_COUNT * 2, 2)"""
+
+        if self.__vertices is None:
+            n = self.__size
+            self.__vertices = self.__compute_vertices(
+                self.__centers[:n], self.__inner_rotations[:n], self.__inner_radiuses[:n], self.__outer_radiuses[:n]
+            )
+
+        return self.__vertices
+
+    def __get_display_vertices(self) -> np.ndarray:
+        if self.__interpolation >= 1:
+            return self.get_vertices()
+
+        if self.__display_vertices is None:
+            n = self.__size
+            lag = 1 - self.__interpolation
+            centers = self.__centers[:n] + (self.__previous_centers[:n] - self.__centers[:n]) * lag
+            rotations = self.__inner_rotations[:n] - self.__inner_angle_speeds[:n] * lag
+            self.__display_vertices = self.__compute_vertices(
+                centers, rotations, self.__inner_radiuses[:n], self.__outer_radiuses[:n]
+            )
+
+        return self.__display_vertices
+
+    def __compute_vertices(self, centers: np.ndarray, rotations: np.ndarray,
+                           inner_radiuses: np.ndarray, outer_radiuses: np.ndarray) -> np.ndarray:
+        angles = np.radians(rotations)[:, np.newaxis]
+        cos_fi, sin_fi = np.cos(angles), np.sin(angles)
+
+        radiuses = np.empty((len(centers), self.POINTS_COUNT * 2))
+        radiuses[:, 0::2] = outer_radiuses[:, np.newaxis]
+        radiuses[:, 1::2] = inner_radiuses[:, np.newaxis]
+
+        x = radiuses * (self.__UNIT_X * cos_fi - self.__UNIT_Y * sin_fi)
+        y = radiuses * (self.__UNIT_X * sin_fi + self.__UNIT_Y * cos_fi)
+        return np.stack((x, y), axis=-1) + centers[:, np.newaxis, :]
+
+    def __update_alphas(self, centers: np.ndarray, draw_rect: QRect):
+        distances = np.minimum.reduce((
+            centers[:, 0] - draw_rect.x(),
+            draw_rect.x() + draw_rect.width() - centers[:, 0],
+            centers[:, 1] - draw_rect.y(),
+            draw_rect.y() + draw_rect.height() - centers[:, 1]
+        ))
+
+        # чем меньше distance тем меньше alpha_value
+        fading = distances <= min(draw_rect.width(), draw_rect.height()) / 3
+        self.__alphas[:self.__size][fading] = np.clip(np.trunc(distances[fading] - 15), 0, 255)
+
+    def __update_characteristics(self, n: int):
+        rotations = self.__inner_rotations[:n]
+        rotations += self.__inner_angle_speeds[:n]
+        np.fmod(rotations, 360, out=rotations)
+
+        self.__distance_coeffs[:n] *= 0.9
+        self.__distance_speeds[:n] += self.__distance_coeffs[:n]
+        self.__outer_angle_speeds[:n] *= 0.99
+
+    def __merge(self, keep: int, absorbed: int):
+        self.__inner_radiuses[keep] = StarInteractions.merged_radius(
+            self.__inner_radiuses[keep], self.__inner_radiuses[absorbed]
+        )
+        self.__outer_radiuses[keep] = StarInteractions.merged_radius(
+            self.__outer_radiuses[keep], self.__outer_radiuses[absorbed]
+        )
+
+    def __cull(self, draw_rect: QRect, alive: np.ndarray, margin: float):
+        """Удаляет звёзды с alive == False и вышедшие за draw_rect.
+
+        Вершины проверяются только у звёзд из клеток сетки у границы draw_rect.
+        """
+
+        n = self.__size
+        candidates = np.flatnonzero(self.__grid.near_boundary(QRectF(draw_rect), margin) & alive)
+        if len(candidates):
+            vertices = np.round(self.__compute_vertices(
+                self.__centers[candidates], self.__inner_rotations[candidates],
+                self.__inner_radiuses[candidates], self.__outer_radiuses[candidates]
+            ))
+            alive[candidates] = np.all(
+                (vertices[..., 0] >= draw_rect.left()) & (vertices[..., 0] <= draw_rect.right()) &
+                (vertices[..., 1] >= draw_rect.top()) & (vertices[..., 1] <= draw_rect.bottom()),
+                axis=1
+            )
+
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count == self.__size:
+            return
+
+        for array in self.__arrays():
+            array[:alive_count] = array[:n][alive]
+
+        self.__size = alive_count
+
+    def __grow(self):
+        capacity = len(self.__alphas) * 2
+        (
+            self.__centers, self.__previous_centers, self.__inner_radiuses, self.__outer_radiuses,
+            self.__inner_rotations, self.__inner_angle_speeds, self.__outer_angle_speeds,
+            self.__distance_speeds, self.__distance_coeffs, self.__alphas, self.__ages
+        ) = (
+            np.resize(array, (capacity,) + array.shape[1:]) for array in self.__arrays()
+        )
+
+    def __record_fields(self):
+        return (
+            ('center', self.__centers), ('previous_center', self.__previous_centers),
+            ('inner_rotation', self.__inner_rotations),
+            ('inner_radius', self.__inner_radiuses), ('outer_radius', self.__outer_radiuses),
+            ('inner_angle_speed', self.__inner_angle_speeds), ('outer_angle_speed', self.__outer_angle_speeds),
+            ('distance_speed', self.__distance_speeds), ('distance_coeff', self.__distance_coeffs),
+            ('alpha', self.__alphas), ('age', self.__ages),
+        )
+
+    def __arrays(self):
+        return (
+            self.__centers, self.__previous_centers, self.__inner_radiuses, self.__outer_radiuses,
+            self.__inner_rotations, self.__inner_angle_speeds, self.__outer_angle_speeds,
+            self.__distance_speeds, self.__distance_coeffs, self.__alphas, self.__ages
+        )
+
+    def __draw_vertices(self, vertices: np.ndarray, scale: float, painter: QPainter):
+        n = self.__size
+        point, simplified, full = level_of_detail.select_many(self.__outer_radiuses[:n] * 2 * scale)
+
+        # общий путь из тысяч многоугольников растеризуется дольше, чем по многоугольнику на звезду
+        alphas = style_cache.quantize_alphas(self.alphas)
+        for alpha in np.unique(alphas).tolist():
+            same_alpha = alphas == alpha
+
+            painter.setPen(style_cache.pen_with_alpha(self.__pen, alpha))
+            painter.setBrush(style_cache.brush_with_alpha(self.__brush, alpha))
+            for polygons in (vertices[same_alpha & full], simplify_vertices(vertices[same_alpha & simplified])):
+                for polygon in polygons:
+                    painter.drawPolygon(QPolygonF(array_to_points(polygon)))
+
+            points = vertices[same_alpha & point]
+            if len(points):
+                painter.setPen(Qt.NoPen)
+                painter.drawRects(squares(
+                    points.mean(axis=1), np.maximum(np.ptp(points, axis=1).max(axis=1) / 2, 1)
+                ))
@@ -0,0 +1,75 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from graphics.spatial_grid import SpatialGrid
+
+
+class StarInteractions:
+    """Расталкивание и слияние звёзд по парам соседей из SpatialGrid"""
+
+    REPULSION_DISTANCE_FACTOR = 1.5  # звёзды расталкиваются, если ближе (r_i + r_j) * factor
+    REPULSION_STRENGTH = 0.25  # доля перекрытия, устраняемая за один шаг
+    MERGE_DISTANCE_FACTOR = 0.5  # звёзды сливаются, если ближе (r_i + r_j) * factor
+    MERGE_MIN_AGE = 15  # только что созданные звёзды у цветка не сливаются
+
+    @classmethod
+    def cell_size(cls, outer_radiuses: np.ndarray) -> float:
+        """Размер клетки, при котором все взаимодействующие пары лежат в соседних клетках"""
+
+        if len(outer_radiuses) == 0:
+            return 0
+
+        return cls.REPULSION_DISTANCE_FACTOR * 2 * float(outer_radiuses.max())
+
+    def step(self, grid: SpatialGrid, centers: np.ndarray, outer_radiuses: np.ndarray,
+             ages: np.ndarray) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """Возвращает смещения центров формы (N, 2) и пары слияний (поглощающая, поглощённая).
+
+        grid должен быть построен по centers с размером клетки cell_size(outer_radiuses).
+        """
+
+        displacements = np.zeros_like(centers)
+        i, j, distances = grid.pairs_within(grid.cell_size)
+        if len(i) == 0:
+            return displacements, []
+
+        touch_distances = outer_radiuses[i] + outer_radiuses[j]
+
+        repelling = (distances < touch_distances * self.REPULSION_DISTANCE_FACTOR) & (distances > 0)
+        ri, rj, rd = i[repelling], j[repelling], distances[repelling]
+        overlap = touch_distances[repelling] * self.REPULSION_DISTANCE_FACTOR - rd
+        push = ((centers[ri] - centers[rj]) / rd[:, np.newaxis]) * (overlap * self.REPULSION_STRENGTH / 2)[:, np.newaxis]
+        np.add.at(displacements, ri, push)
+        np.subtract.at(displacements, rj, push)
+
+        merging = (distances < touch_distances * self.MERGE_DISTANCE_FACTOR) & \
+                  (ages[i] >= self.MERGE_MIN_AGE) & (ages[j] >= self.MERGE_MIN_AGE)
+
+        return displacements, self.__resolve_merges(i[merging], j[merging], distances[merging], outer_radiuses)
+
+    @staticmethod
+    def merged_radius(first_radius: float, second_radius: float) -> float:
+        """Радиус звезды с суммарной площадью двух сливающихся"""
+
+        return float(np.hypot(first_radius, second_radius))
+
+    @staticmethod
+    def __resolve_merges(i: np.ndarray, j: np.ndarray, distances: np.ndarray,
+                         outer_radiuses: np.ndarray) -> List[Tuple[int, int]]:
+        merges = []
+        used = set()
+
+        # ближайшие пары сливаются первыми, каждая звезда участвует не более чем в одном слиянии за шаг
+        for k in np.argsort(distances).tolist():
+            first, second = int(i[k]), int(j[k])
+            if first in used or second in used:
+                continue
+
+            if outer_radiuses[second] > outer_radiuses[first]:
+                first, second = second, first
+
+            merges.append((first, second))
+            used.update((first, second))
+
+        return merges
@@ -0,0 +1,51 @@
+from typing import List
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPen, QBrush
+
+from physical_star import PhysicalStar
+
+
+class StarPool:
+    """Хранит потухшие PhysicalStar и выдаёт их повторно вместо создания новых"""
+
+    MAX_SIZE = 1024
+
+    def __init__(self, max_size: int = MAX_SIZE):
+        self.__max_size = max_size
+        self.__free: List[PhysicalStar] = []
+        self.__created_count = 0
+        self.__reused_count = 0
+
+    @property
+    def free_count(self) -> int:
+        return len(self.__free)
+
+    @property
+    def created_count(self) -> int:
+        return self.__created_count
+
+    @property
+    def reused_count(self) -> int:
+        return self.__reused_count
+
+    def acquire(self, inner_radius: float, outer_radius: float,
+                inner_angle_speed: float, outer_angle_speed: float, distance_speed: float,
+                center: QPointF, pen: QPen, brush: QBrush) -> PhysicalStar:
+        if self.__free:
+            star = self.__free.pop()
+            star.reset(inner_radius, outer_radius, inner_angle_speed, outer_angle_speed, distance_speed,
+                       center, pen, brush)
+            self.__reused_count += 1
+            return star
+
+        self.__created_count += 1
+        return PhysicalStar(
+            inner_radius=inner_radius, outer_radius=outer_radius,
+            inner_angle_speed=inner_angle_speed, outer_angle_speed=outer_angle_speed,
+            distance_speed=distance_speed, center=center, pen=pen, brush=brush
+        )
+
+    def release(self, star: PhysicalStar):
+        if len(self.__free) < self.__max_size:
+            self.__free.append(star)
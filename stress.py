@@ -0,0 +1,129 @@
+"""Нагрузочный прогон сцены с заданным числом звёзд и композиций.
+
+    python stress.py --stars 5000 --spawn-chance 20 --compositions 4 --frames 600
+    python stress.py --star-field --stars 5000 --spawn-chance 100 --warmup 60 --frames 60
+    python stress.py --onscreen --width 1920 --height 1080 --json stress.jsonl
+
+Каждый кадр делает один шаг симуляции и перерисовку всех композиций.
+Без --onscreen кадры рисуются в QImage, с ним - в показанные окна.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS - байты
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def run(args) -> dict:
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtWidgets import QApplication
+    from main import Composition, MainWidget
+
+    app = QApplication.instance() or QApplication([])
+    random.seed(args.seed)
+
+    Composition.MAX_STARS_COUNT = args.stars
+    Composition.CHANCE_OF_STAR_CREATING_IN_FRAME = args.spawn_chance
+    Composition.USE_STAR_FIELD = args.star_field
+
+    size = QSize(args.width, args.height)
+    windows: List[MainWidget] = []
+    for index in range(args.compositions):
+        window = MainWidget(f'stress {index}')
+        # кадрами управляет прогон, а не таймер окна
+        window.scheduler.stop()
+        window.resize(size)
+        window.composition.update_components(MainWidget.draw_rect_for(size))
+        window.composition.press_button()
+        if args.onscreen:
+            window.show()
+        windows.append(window)
+
+    images = [QImage(size, QImage.Format_ARGB32_Premultiplied) for _ in windows] if not args.onscreen else []
+
+    frame_times = []
+    stars_counts = []
+    for frame in range(args.warmup + args.frames):
+        start = time.perf_counter()
+        for index, window in enumerate(windows):
+            window.composition.animation()
+            if args.onscreen:
+                window.repaint()
+            else:
+                images[index].fill(window.palette().window().color())
+                painter = QPainter(images[index])
+                painter.setRenderHint(QPainter.Antialiasing)
+                window.draw_frame(painter, size)
+                painter.end()
+        if args.onscreen:
+            app.processEvents()
+
+        if frame >= args.warmup:
+            frame_times.append(time.perf_counter() - start)
+            stars_counts.append(sum(window.composition.stars_count() for window in windows))
+
+    for window in windows:
+        window.close()
+
+    frame_ms = np.array(frame_times) * 1000
+    return dict(
+        frames=args.frames, compositions=args.compositions, width=args.width, height=args.height,
+        max_stars=args.stars, spawn_chance=args.spawn_chance, star_field=args.star_field, seed=args.seed,
+        onscreen=args.onscreen,
+        fps=len(frame_times) / sum(frame_times),
+        frame_ms=dict(
+            p50=float(np.percentile(frame_ms, 50)), p90=float(np.percentile(frame_ms, 90)),
+            p99=float(np.percentile(frame_ms, 99)), max=float(frame_ms.max())
+        ),
+        mean_stars=float(np.mean(stars_counts)), final_stars=stars_counts[-1],
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stars', type=int, default=1000, help='предел числа звёзд в композиции')
+    parser.add_argument('--spawn-chance', type=float, default=1.0,
+                        help='звёзд за шаг: целая часть и ещё одна с вероятностью дробной')
+    parser.add_argument('--star-field', action='store_true', help='звёзды в массивах StarField вместо PhysicalStar')
+    parser.add_argument('--compositions', type=int, default=1, help='число окон с вентилятором')
+    parser.add_argument('--width', type=int, default=1200)
+    parser.add_argument('--height', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=0, help='кадры до начала замеров, пока сцена заполняется')
+    parser.add_argument('--onscreen', action='store_true', help='рисовать в показанные окна')
+    parser.add_argument('--json', help='дописать результат строкой JSON в этот файл')
+    args = parser.parse_args()
+
+    if not args.onscreen:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    result = run(args)
+
+    frame_ms = result['frame_ms']
+    print(f"{result['frames']} frames x {result['compositions']} compositions {args.width}x{args.height}, "
+          f"{result['mean_stars']:.0f} stars on average ({result['final_stars']} at the end)")
+    print(f"{result['fps']:.1f} FPS, frame time p50 {frame_ms['p50']:.2f} ms, p90 {frame_ms['p90']:.2f} ms, "
+          f"p99 {frame_ms['p99']:.2f} ms, max {frame_ms['max']:.2f} ms")
+    print(f"peak RSS {result['peak_rss_mb']:.1f} MB")
+
+    if args.json:
+        with open(args.json, 'a') as file:
+            file.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
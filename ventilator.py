@@ -1,3 +1,5 @@
+from typing import Dict, Optional, Tuple
+
 from PyQt5.QtCore import QRect, Qt, QPointF, QPoint, QRectF
 from PyQt5.QtGui import QPainter, QBrush, QColor, QPen
 
@@ -12,11 +14,24 @@ class Ventilator(Picture):
     MAIN_PEN_THICKNESS = 3  # Толщина основного пера
     LEG_THICKNESS_IN_PERCENT = 0.025
     PETAL_COUNT = 5
+    ROTATION_STEP = -15  # поворот цветка за один шаг симуляции
+
+    def __init__(self, draw_rect: QRect, draw_static: bool = True, draw_flower: bool = True,
+                 flower_sprites: bool = False):
+        """draw_static, draw_flower: рисовать ли эти части в draw; иначе их рисуют отдельно,
+        например draw_static и draw_flower со своими кэшами.
+        """
 
-    def __init__(self, draw_rect: QRect):
         super(Ventilator, self).__init__()
         self.__draw_rect = draw_rect
         self.__enabled = False
+        self.__draw_static = draw_static
+        self.__draw_flower = draw_flower
+
+        # раскладка цветка по координатам прямоугольника: центр, радиус сердцевины, радиус лепестков;
+        # обычно их два - для основной половины и для отражённой в draw_with_affine
+        self.__layouts: Dict[Tuple[int, int, int, int], Tuple[QPointF, float, float]] = {}
+        self.__layout_key: Optional[Tuple[int, int, int, int]] = None
 
         main_pen = QPen(Qt.black, self.MAIN_PEN_THICKNESS)
         self.__flower = Flower(
@@ -25,7 +40,8 @@ class Ventilator(Picture):
                 pen=main_pen,
                 brush=QBrush(Qt.black)
             ),
-            brush=QBrush(QColor("purple"))
+            brush=QBrush(QColor("purple")),
+            use_sprites=flower_sprites
         )
 
         self.components = [self.__flower, ]
@@ -34,7 +50,10 @@ class Ventilator(Picture):
         return self.__flower
 
     def set_draw_rect(self, draw_rect: QRect):
+        if draw_rect != self.__draw_rect:
+            self.__layouts.clear()
         self.__draw_rect = draw_rect
+        self.__update_components_position(draw_rect)
 
     def is_enabled(self) -> bool:
         return self.__enabled
@@ -43,7 +62,7 @@ class Ventilator(Picture):
         self.__enabled = not self.__enabled
 
     def animation(self):
-        self.__flower.rotate(-15)
+        self.__flower.rotate(self.ROTATION_STEP if self.__enabled else 0)
 
     def draw(self, painter: QPainter):
         self.draw_by_rect(self.__draw_rect, painter)
@@ -51,26 +70,81 @@ class Ventilator(Picture):
     def draw_with_affine(self, affine_matrix: Matrix, painter: QPainter):
         self.draw_by_rect(affine_to_rect(self.__draw_rect, affine_matrix), painter)
 
+    def draw_static(self, painter: QPainter):
+        """Рисует только неподвижные части: ножку и платформу"""
+
+        self.draw_static_by_rect(self.__draw_rect, painter)
+
+    def draw_static_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.draw_static_by_rect(affine_to_rect(self.__draw_rect, affine_matrix), painter)
+
+    def draw_flower(self, painter: QPainter):
+        self.draw_flower_by_rect(self.__draw_rect, painter)
+
+    def draw_flower_with_affine(self, affine_matrix: Matrix, painter: QPainter):
+        self.draw_flower_by_rect(affine_to_rect(self.__draw_rect, affine_matrix), painter)
+
     def draw_by_rect(self, rect: QRect, painter: QPainter):
+        self.__update_components_position(rect)
+        # Порядок важен
+        if self.__draw_static:
+            self.draw_static_by_rect(rect, painter)
+        if self.__draw_flower:
+            super().draw(painter)
+
+    def draw_flower_by_rect(self, rect: QRect, painter: QPainter):
+        self.__update_components_position(rect)
+        self.__flower.draw(painter)
+
+    def bounding_rect(self) -> QRectF:
+        start = self.__draw_rect.bottomLeft()
+        width = self.__draw_rect.width()
+        height = self.__draw_rect.height()
+        margin = max(self.MAIN_PEN_THICKNESS, height * self.LEG_THICKNESS_IN_PERCENT)
+
+        # ножка и платформа
+        static_rect = QRectF(
+            QPointF(start.x() + 0.3 * width, start.y() - height * 0.65),
+            QPointF(start.x() + 0.7 * width, start.y())
+        ).adjusted(-margin, -margin, margin, margin)
+
+        return static_rect.united(super().bounding_rect())
+
+    def draw_static_by_rect(self, rect: QRect, painter: QPainter):
         start = rect.bottomLeft()
         width = rect.width()
         height = rect.height()
         painter.setPen(QPen(Qt.black))
-        self.__update_components_position(start, width, height)
-        # Порядок важен
         self.__draw_leg(painter, start, width, height)
         self.__draw_platform(painter, start, width, height)
-        super().draw(painter)
 
-    def __update_components_position(self, start: QPointF, width: float, height: float):
-        self.__flower.core.center = QPointF(
+    def __update_components_position(self, rect: QRect):
+        """Ставит цветок по rect; раскладка считается один раз на прямоугольник, пока не сменится draw_rect"""
+
+        key = rect.getCoords()
+        if key == self.__layout_key:
+            return
+
+        layout = self.__layouts.get(key)
+        if layout is None:
+            layout = self.__layouts[key] = self.__compute_layout(rect.bottomLeft(), rect.width(), rect.height())
+
+        center, core_radius, petal_radius = layout
+        self.__flower.core.center = QPointF(center)
+        self.__flower.core.radius = core_radius
+        self.__flower.petal_radius = petal_radius
+        self.__layout_key = key
+        self.invalidate_bounds()
+
+    @staticmethod
+    def __compute_layout(start: QPointF, width: float, height: float) -> Tuple[QPointF, float, float]:
+        center = QPointF(
             start.x() + width * 0.5,
             start.y() - height * 0.65
         )
 
         radius_coefficient = min(height, width)
-        self.__flower.core.radius = radius_coefficient * 0.05
-        self.__flower.petal_radius = radius_coefficient * 0.25
+        return center, radius_coefficient * 0.05, radius_coefficient * 0.25
 
     def __draw_leg(self, painter: QPainter, start: QPoint, width: float, height: float):
         painter.setPen(QPen(Qt.black, height * self.LEG_THICKNESS_IN_PERCENT))